@@ -9,14 +9,21 @@ from .models import (
     PaymentRequest, PaymentMethod, PaymentQR, Game, StoreItem, Order, Notification,
     FullTournament, FullTournamentParticipant
 )
+from .catalog import invalidate_catalog
+from .fulfilment import notify_orders
+from .home import invalidate_featured, invalidate_tournaments
+from .images import derivative_url
+from .purchases import ItemStock
+from .search import FullTextSearchMixin
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(FullTextSearchMixin, BaseUserAdmin):
     """Custom user admin"""
     list_display = ['username', 'user_id', 'email', 'coins', 'total_tournaments_won', 'is_staff']
     list_filter = ['is_staff', 'is_superuser', 'is_active']
     search_fields = ['username', 'email', 'user_id']
+    search_index = 'user'
     
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Gaming Profile', {
@@ -95,12 +102,14 @@ class TournamentAdmin(admin.ModelAdmin):
     def start_tournament(self, request, queryset):
         """Start selected tournaments"""
         queryset.update(status='ongoing')
+        invalidate_tournaments()
         self.message_user(request, f'Started {queryset.count()} tournaments')
     start_tournament.short_description = 'Start selected tournaments'
     
     def complete_tournament(self, request, queryset):
         """Complete selected tournaments"""
         queryset.update(status='completed')
+        invalidate_tournaments()
         self.message_user(request, f'Completed {queryset.count()} tournaments')
     complete_tournament.short_description = 'Complete selected tournaments'
     
@@ -129,6 +138,7 @@ class TournamentAdmin(admin.ModelAdmin):
                 )
         
         queryset.update(status='cancelled')
+        invalidate_tournaments()
         self.message_user(request, f'Cancelled {queryset.count()} tournaments and refunded participants')
     cancel_tournament.short_description = 'Cancel selected tournaments (with refund)'
 
@@ -208,7 +218,7 @@ class TournamentResultAdmin(admin.ModelAdmin):
             return format_html(
                 '<a href="{}" target="_blank"><img src="{}" style="width: 60px; height: 60px; object-fit: cover; border-radius: 8px; border: 2px solid #e5e7eb;" /></a>',
                 obj.screenshot.url,
-                obj.screenshot.url
+                derivative_url(obj.screenshot, 'xs')
             )
         return '-'
     screenshot_preview.short_description = 'Screenshot'
@@ -219,7 +229,7 @@ class TournamentResultAdmin(admin.ModelAdmin):
             return format_html(
                 '<a href="{}" target="_blank"><img src="{}" style="max-width: 600px; max-height: 600px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);" /></a><br><br><a href="{}" target="_blank" class="button">View Full Size</a>',
                 obj.screenshot.url,
-                obj.screenshot.url,
+                derivative_url(obj.screenshot, 'lg'),
                 obj.screenshot.url
             )
         return 'No screenshot uploaded'
@@ -300,21 +310,25 @@ class TournamentResultAdmin(admin.ModelAdmin):
 
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Transaction admin"""
     list_display = ['user', 'transaction_type', 'amount', 'balance_after', 'created_at']
     list_filter = ['transaction_type', 'created_at']
     search_fields = ['user__username', 'description']
+    search_index = 'transaction'
+    exact_search_fields = ['user__username']
     date_hierarchy = 'created_at'
     readonly_fields = ['user', 'transaction_type', 'amount', 'balance_after', 'created_at']
 
 
 @admin.register(PaymentRequest)
-class PaymentRequestAdmin(admin.ModelAdmin):
+class PaymentRequestAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Payment request admin"""
     list_display = ['user', 'coins_amount', 'payment_amount', 'payment_method', 'status_badge', 'screenshot_preview', 'created_at', 'processed_by']
     list_filter = ['status', 'payment_method', 'created_at', 'processed_by']
     search_fields = ['user__username', 'transaction_id', 'user__email']
+    search_index = 'payment'
+    exact_search_fields = ['user__username', 'user__email']
     date_hierarchy = 'created_at'
     list_per_page = 20
     
@@ -354,7 +368,7 @@ class PaymentRequestAdmin(admin.ModelAdmin):
             return format_html(
                 '<a href="{}" target="_blank"><img src="{}" style="width: 60px; height: 60px; object-fit: cover; border-radius: 8px; border: 2px solid #e5e7eb;" /></a>',
                 obj.payment_screenshot.url,
-                obj.payment_screenshot.url
+                derivative_url(obj.payment_screenshot, 'xs')
             )
         return '-'
     screenshot_preview.short_description = 'Screenshot'
@@ -365,7 +379,7 @@ class PaymentRequestAdmin(admin.ModelAdmin):
             return format_html(
                 '<a href="{}" target="_blank"><img src="{}" style="max-width: 500px; max-height: 500px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);" /></a><br><br><a href="{}" target="_blank" class="button">View Full Size</a>',
                 obj.payment_screenshot.url,
-                obj.payment_screenshot.url,
+                derivative_url(obj.payment_screenshot, 'lg'),
                 obj.payment_screenshot.url
             )
         return 'No screenshot uploaded'
@@ -444,7 +458,7 @@ class GameAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="width: 50px; height: 50px; object-fit: cover; border-radius: 8px; border: 2px solid #e5e7eb;" />',
-                obj.image.url
+                derivative_url(obj.image, 'xs')
             )
         return '🎮'
     image_preview.short_description = 'Image'
@@ -467,6 +481,13 @@ class GameAdmin(admin.ModelAdmin):
     item_count.short_description = 'Items'
 
 
+class ItemStockInline(admin.StackedInline):
+    """Limited stock for flash sales; leave empty for unlimited"""
+    model = ItemStock
+    extra = 0
+    max_num = 1
+
+
 @admin.register(StoreItem)
 class StoreItemAdmin(admin.ModelAdmin):
     """Store item admin"""
@@ -489,6 +510,7 @@ class StoreItemAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['image_display', 'created_at', 'updated_at']
+    inlines = [ItemStockInline]
     
     actions = ['mark_featured', 'mark_active', 'mark_inactive']
     
@@ -497,7 +519,7 @@ class StoreItemAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="width: 50px; height: 50px; object-fit: cover; border-radius: 8px; border: 2px solid #e5e7eb;" />',
-                obj.image.url
+                derivative_url(obj.image, 'xs')
             )
         return '📦'
     image_preview.short_description = 'Image'
@@ -507,7 +529,7 @@ class StoreItemAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="max-width: 400px; max-height: 400px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);" />',
-                obj.image.url
+                derivative_url(obj.image, 'md')
             )
         return 'No image uploaded'
     image_display.short_description = 'Item Image'
@@ -537,28 +559,36 @@ class StoreItemAdmin(admin.ModelAdmin):
     def mark_featured(self, request, queryset):
         """Mark items as featured"""
         queryset.update(featured=True)
+        invalidate_catalog()
+        invalidate_featured()
         self.message_user(request, f'{queryset.count()} items marked as featured')
     mark_featured.short_description = 'Mark as featured'
     
     def mark_active(self, request, queryset):
         """Mark items as active"""
         queryset.update(is_active=True)
+        invalidate_catalog()
+        invalidate_featured()
         self.message_user(request, f'{queryset.count()} items marked as active')
     mark_active.short_description = 'Mark as active'
     
     def mark_inactive(self, request, queryset):
         """Mark items as inactive"""
         queryset.update(is_active=False)
+        invalidate_catalog()
+        invalidate_featured()
         self.message_user(request, f'{queryset.count()} items marked as inactive')
     mark_inactive.short_description = 'Mark as inactive'
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Order admin"""
     list_display = ['order_id', 'user', 'item_display', 'total_price_display', 'in_game_id', 'status_badge', 'created_at']
     list_filter = ['status', 'created_at', 'item__game']
     search_fields = ['order_id', 'user__username', 'in_game_id', 'in_game_name', 'user__email']
+    search_index = 'order'
+    exact_search_fields = ['order_id', 'user__username', 'user__email']
     date_hierarchy = 'created_at'
     list_per_page = 20
     
@@ -598,7 +628,7 @@ class OrderAdmin(admin.ModelAdmin):
         if obj.item.image:
             return format_html(
                 '<div style="display: flex; align-items: center; gap: 10px;"><img src="{}" style="width: 40px; height: 40px; object-fit: cover; border-radius: 6px;" /><span>{}</span></div>',
-                obj.item.image.url,
+                derivative_url(obj.item.image, 'xs'),
                 obj.item.name
             )
         return obj.item.name
@@ -609,7 +639,7 @@ class OrderAdmin(admin.ModelAdmin):
         if obj.item.image:
             return format_html(
                 '<img src="{}" style="max-width: 300px; max-height: 300px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);" />',
-                obj.item.image.url
+                derivative_url(obj.item.image, 'md')
             )
         return 'No image'
     item_image_preview.short_description = 'Item Image'
@@ -624,34 +654,28 @@ class OrderAdmin(admin.ModelAdmin):
     
     def mark_processing(self, request, queryset):
         """Mark orders as processing"""
+        order_ids = list(queryset.values_list('pk', flat=True))
         queryset.update(status='processing')
+        notify_orders(
+            Order.objects.filter(pk__in=order_ids),
+            'Order Processing',
+            'Your order {order_id} is being processed.',
+        )
         
-        for order in queryset:
-            Notification.objects.create(
-                user=order.user,
-                notification_type='order',
-                title='Order Processing',
-                message=f'Your order {order.order_id} is being processed.',
-                link='/orders/'
-            )
-        
-        self.message_user(request, f'Marked {queryset.count()} orders as processing')
+        self.message_user(request, f'Marked {len(order_ids)} orders as processing')
     mark_processing.short_description = 'Mark as processing'
     
     def mark_completed(self, request, queryset):
         """Mark orders as completed"""
+        order_ids = list(queryset.values_list('pk', flat=True))
         queryset.update(status='completed', completed_at=timezone.now())
+        notify_orders(
+            Order.objects.filter(pk__in=order_ids),
+            'Order Completed',
+            'Your order {order_id} has been delivered to your game account!',
+        )
         
-        for order in queryset:
-            Notification.objects.create(
-                user=order.user,
-                notification_type='order',
-                title='Order Completed',
-                message=f'Your order {order.order_id} has been delivered to your game account!',
-                link='/orders/'
-            )
-        
-        self.message_user(request, f'Marked {queryset.count()} orders as completed')
+        self.message_user(request, f'Marked {len(order_ids)} orders as completed')
     mark_completed.short_description = 'Mark as completed'
     
     def cancel_order(self, request, queryset):
@@ -0,0 +1,176 @@
+"""
+Static asset bundles
+The stylesheets and scripts under static/ are grouped into BUNDLES.
+``manage.py build_assets`` concatenates and minifies each bundle into
+``static/dist/<name>.<hash>.<ext>``, writes ``.gz`` (and, with the optional
+``brotli`` package, ``.br``) siblings next to it and records the hashed
+names in ``static/dist/manifest.json``. Run it before ``collectstatic``.
+
+The {% asset_css %} / {% asset_js %} tags link the hashed bundle when the
+manifest lists it and fall back to the individual source files otherwise,
+so development works without a build. Hashed names never change content:
+serve ``STATIC_URL + 'dist/'`` with ``Cache-Control: max-age=31536000,
+immutable`` and let the front server pick the precompressed sibling
+(nginx ``gzip_static on; brotli_static on;``).
+"""
+import gzip
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+
+BUNDLES = {
+    'site.css': ['css/base.css', 'css/components.css', 'css/pages.css', 'css/splash.css'],
+    'site.js': ['js/splash.js', 'js/main.js', 'js/tournament_modal.js'],
+    'admin.css': ['css/base.css', 'css/components.css', 'css/custom_admin.css'],
+    'admin.js': ['js/custom_admin.js'],
+    'home.css': ['css/pages/home.css'],
+    'home.js': ['js/pages/home.js'],
+    'chat.css': ['css/pages/chat.css'],
+    'chat.js': ['js/pages/chat.js'],
+    'profile.css': ['css/pages/profile.css'],
+    'profile.js': ['js/pages/profile.js'],
+    # Generated by build_icons (see core.icons)
+    'icons.css': ['css/icons.css'],
+}
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+
+# Not worth compressing below this
+PRECOMPRESS_MIN_SIZE = 256
+
+# '/*!' comments (licences) are kept
+_CSS_COMMENT_RE = re.compile(r'/\*(?!!).*?\*/', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON_RE = re.compile(r':\s+')
+_JS_LINE_COMMENT_RE = re.compile(r'^\s*//')
+
+
+def source_dir():
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def output_dir():
+    return source_dir() / DIST_DIR
+
+
+def minify_css(source):
+    """
+    Drop comments and collapse whitespace. Spaces before ``:`` are kept
+    (``.a :hover`` is a descendant selector), as is everything inside
+    ``calc()`` apart from runs of whitespace.
+    """
+    source = _CSS_COMMENT_RE.sub('', source)
+    source = _CSS_SPACE_RE.sub(' ', source)
+    source = _CSS_PUNCTUATION_RE.sub(r'\1', source)
+    source = _CSS_COLON_RE.sub(':', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """
+    Strip indentation, blank lines and whole-line ``//`` comments. Line
+    breaks are kept so automatic semicolon insertion still applies; the
+    sources have no multi-line template literals to disturb.
+    """
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not _JS_LINE_COMMENT_RE.match(line))
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def bundle_source(name):
+    root = source_dir()
+    return '\n'.join((root / path).read_text(encoding='utf-8') for path in BUNDLES[name])
+
+
+def hashed_name(name, content):
+    stem, ext = name.rsplit('.', 1)
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    return f'{stem}.{digest}.{ext}'
+
+
+def precompress(path, content):
+    """Write ``path.gz`` (and ``path.br``); returns the suffixes written"""
+    if len(content) < PRECOMPRESS_MIN_SIZE:
+        return []
+    written = []
+    Path(f'{path}.gz').write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+    written.append('.gz')
+    if brotli is not None:
+        Path(f'{path}.br').write_bytes(brotli.compress(content, quality=11))
+        written.append('.br')
+    return written
+
+
+def build():
+    """
+    Build every bundle into output_dir() and write the manifest.
+    Returns ``{bundle: (hashed name, source bytes, minified bytes, compressed suffixes)}``,
+    with None for bundles whose sources don't exist.
+    """
+    out = output_dir()
+    out.mkdir(parents=True, exist_ok=True)
+    manifest, report = {}, {}
+    for name, paths in BUNDLES.items():
+        if not all((source_dir() / path).exists() for path in paths):
+            report[name] = None  # e.g. icons.css before build_icons has run
+            continue
+        source = bundle_source(name)
+        content = MINIFIERS[Path(name).suffix](source).encode('utf-8')
+        target = hashed_name(name, content)
+        path = out / target
+        if not path.exists():
+            path.write_bytes(content)
+        suffixes = precompress(path, content)
+        manifest[name] = f'{DIST_DIR}/{target}'
+        report[name] = (target, len(source.encode('utf-8')), len(content), suffixes)
+
+    manifest_path = out / MANIFEST_NAME
+    tmp_path = out / f'{MANIFEST_NAME}.tmp'
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp_path.replace(manifest_path)
+    load_manifest.cache_clear()
+    return report
+
+
+def prune(keep):
+    """Remove built files that aren't in ``keep`` (hashed names); returns the count"""
+    removed = 0
+    for path in output_dir().iterdir():
+        base = path.name.removesuffix('.gz').removesuffix('.br')
+        if path.name != MANIFEST_NAME and base not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+@lru_cache(maxsize=1)
+def load_manifest():
+    try:
+        return json.loads((output_dir() / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def bundle_paths(name):
+    """Static paths to link for bundle ``name``: the built file or its sources"""
+    if name not in BUNDLES:
+        raise KeyError(f'Unknown asset bundle {name!r}')
+    built = load_manifest().get(name)
+    if built and not getattr(settings, 'ASSETS_DEBUG', False):
+        return [built]
+    return BUNDLES[name]
@@ -0,0 +1,127 @@
+"""
+Cache helpers
+Keys are grouped into namespaces ('catalog', 'home', 'dashboard', ...).
+Each namespace has a version number stored in the cache itself and built
+into every key, so invalidate(namespace) drops all of its entries at once
+by bumping the version; the old entries simply expire.
+
+get_or_compute() is the read-through entry point. On a miss only one
+caller recomputes the value (a short lock taken with cache.add(), which is
+atomic on the local-memory and Redis backends); the others wait briefly
+for it instead of stampeding the database. Hits and misses are counted
+per process for the admin dashboard.
+
+The backend is chosen per environment with CACHE_BACKEND (see settings).
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+
+
+DEFAULT_TIMEOUT = 5 * 60
+
+# How long a recompute may hold the lock, and how long others wait for it
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+# A namespace version is only ever dropped by eviction; it is then
+# restarted from the clock so it can't collide with an earlier one
+VERSION_TIMEOUT = None
+
+_MISSING = object()
+
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'waits': 0})
+_stats_lock = threading.Lock()
+
+
+def _count(namespace, what):
+    with _stats_lock:
+        _stats[namespace][what] += 1
+
+
+def stats():
+    """``{namespace: {'hits', 'misses', 'waits', 'hit_rate'}}`` for this process"""
+    with _stats_lock:
+        result = {}
+        for namespace, counts in sorted(_stats.items()):
+            total = counts['hits'] + counts['misses']
+            result[namespace] = {**counts, 'hit_rate': counts['hits'] / total if total else None}
+        return result
+
+
+def _version_key(namespace):
+    return f'ns:{namespace}'
+
+
+def namespace_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def namespace_versions(*namespaces):
+    """``{namespace: version}`` with one cache round trip when they're all set"""
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    versions = {keys[key]: version for key, version in found.items()}
+    for namespace in namespaces:
+        if namespace not in versions:
+            versions[namespace] = namespace_version(namespace)
+    return versions
+
+
+def make_key(namespace, *parts):
+    """Cache key for ``parts`` under the current version of ``namespace``"""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{namespace}:{namespace_version(namespace)}:{suffix}'
+
+
+def invalidate(*namespaces):
+    """Drop every entry of the given namespaces"""
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            pass  # not cached yet, so nothing to drop
+
+
+def get_or_compute(namespace, key, compute, timeout=DEFAULT_TIMEOUT):
+    """
+    The cached value of ``key`` in ``namespace`` (a string or tuple of
+    parts), computing and storing it on a miss. ``compute`` takes no
+    arguments; None is a valid value.
+    """
+    parts = key if isinstance(key, tuple) else (key,)
+    full_key = make_key(namespace, *parts)
+    value = cache.get(full_key, _MISSING)
+    if value is not _MISSING:
+        _count(namespace, 'hits')
+        return value
+    _count(namespace, 'misses')
+
+    lock_key = f'lock:{full_key}'
+    locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    if not locked:
+        # Someone else is computing it; wait for their result
+        _count(namespace, 'waits')
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(full_key, _MISSING)
+            if value is not _MISSING:
+                return value
+        # They're slow or died; compute it ourselves rather than fail
+
+    try:
+        value = compute()
+        cache.set(full_key, value, timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
@@ -0,0 +1,126 @@
+"""
+Store catalog
+The whole game -> items tree is built with three queries (games with
+annotated item counts, their product types, then every item) and cached
+(core.caching namespace 'catalog') until a Game, StoreItem or ProductType
+changes. The admin store page reads the whole tree; the public pages take
+the active games from it and query one game's items at a time (by type
+through the ProductType m2m). store_page() and store_game_items_page()
+also cache the rendered pages (core.page_cache) on the same namespace.
+item_counts() keeps the admin's store-wide totals, which include items
+not attached to any game.
+"""
+from django.db.models import Count, Q
+from django.http import Http404
+from django.shortcuts import render
+
+from .caching import get_or_compute, invalidate
+from .models import Game, StoreItem
+from .page_cache import cached_page
+from .product_types import ProductType, items_of_type
+
+
+CATALOG_NAMESPACE = 'catalog'
+CATALOG_TIMEOUT = 60 * 60  # seconds; saves invalidate it sooner
+
+
+def build_catalog():
+    """Return ``{slug: category}`` for every game, in display order"""
+    games = Game.objects.annotate(
+        total=Count('items'),
+        active=Count('items', filter=Q(items__is_active=True)),
+    ).order_by('display_order', 'name')
+
+    types_by_game = {}
+    for product_type in ProductType.objects.order_by('display_order', 'name'):
+        types_by_game.setdefault(product_type.game_id, []).append(product_type)
+
+    items_by_game = {}
+    for item in StoreItem.objects.filter(game__isnull=False).order_by('-created_at'):
+        items_by_game.setdefault(item.game_id, []).append(item)
+
+    catalog = {}
+    for game in games:
+        catalog[game.slug] = {
+            'id': game.pk,
+            'name': game.name,
+            'title': f'{game.name.upper()} PRODUCTS',
+            'types': types_by_game.get(game.pk, []),
+            'items': items_by_game.get(game.pk, []),
+            'url_param': game.slug,
+            'icon': game.icon,
+            'image': game.image.url if game.image else None,
+            'is_active': game.is_active,
+            'total': game.total,
+            'active': game.active,
+        }
+    return catalog
+
+
+def get_catalog():
+    """The cached catalog tree, rebuilt on a miss"""
+    return get_or_compute(CATALOG_NAMESPACE, 'tree', build_catalog, CATALOG_TIMEOUT)
+
+
+def item_counts():
+    """``{'total': ..., 'active': ...}`` over every StoreItem, with or without a game"""
+    return get_or_compute(CATALOG_NAMESPACE, 'counts', lambda: StoreItem.objects.aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+    ), CATALOG_TIMEOUT)
+
+
+def invalidate_catalog():
+    invalidate(CATALOG_NAMESPACE)
+
+
+def public_catalog():
+    """Active games only, for the public store page"""
+    return {
+        slug: category for slug, category in get_catalog().items()
+        if category['is_active']
+    }
+
+
+def public_items(slug, product_type=None):
+    """
+    ``(category, items)`` for an active game's store page, featured items
+    first, or ``(None, [])`` when the game doesn't exist or is hidden.
+    The items come from an indexed (game, is_active) query, narrowed
+    through the ProductType m2m when ``product_type`` (a type slug) is
+    given; the page itself is cached by store_game_items_page().
+    """
+    category = public_catalog().get(slug)
+    if category is None:
+        return None, []
+    if product_type:
+        items = items_of_type(category['id'], product_type)
+    else:
+        items = StoreItem.objects.filter(game_id=category['id'], is_active=True)
+    return category, list(items.order_by('-featured', '-created_at'))
+
+
+def store_page_context():
+    """Template context for core/store.html"""
+    return {'game_categories': public_catalog()}
+
+
+def store_game_items_context(slug, product_type=None):
+    """Template context for core/store_game_items.html, or None for a 404"""
+    category, items = public_items(slug, product_type)
+    if category is None:
+        return None
+    return {'game_info': category, 'items': items, 'product_type': product_type}
+
+
+@cached_page((CATALOG_NAMESPACE,), CATALOG_TIMEOUT)
+def store_page(request):
+    return render(request, 'core/store.html', store_page_context())
+
+
+@cached_page((CATALOG_NAMESPACE,), CATALOG_TIMEOUT)
+def store_game_items_page(request, slug):
+    context = store_game_items_context(slug, request.GET.get('type') or None)
+    if context is None:
+        raise Http404
+    return render(request, 'core/store_game_items.html', context)
@@ -18,6 +18,8 @@ urlpatterns = [
     # Order Management
     path('orders/', views.order_management, name='orders'),
     path('orders/<int:order_id>/update/', views.update_order_status, name='update_order'),
+    path('orders/batches/', views.fulfilment_batches, name='fulfilment_batches'),
+    path('orders/batches/<int:batch_id>/', views.fulfilment_batch, name='fulfilment_batch'),
     
     # Store Management
     path('store/', views.store_management, name='store'),
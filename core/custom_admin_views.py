@@ -5,61 +5,43 @@ Separate from Django admin - for website customization
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Sum, Count, Q
+from django.db.models import Count, Q
 from django.utils import timezone
 from django.forms import modelformset_factory
-from datetime import timedelta
+from django.http import HttpResponse
+import csv
 
 from .models import (
-    User, Tournament, StoreItem, Order, PaymentRequest,
+    User, StoreItem, Order, PaymentRequest,
     Transaction, Notification, PaymentMethod, Game, FullTournament,
     SliderImage, WithdrawalRequest, ChatMessage
 )
+from . import search as search_index
+from .caching import stats as cache_stats
+from .catalog import get_catalog, item_counts
+from .dashboard import dashboard_stats
 from .forms import SliderImageForm
+from .fulfilment import FulfilmentBatch, batch_sheet, claim_orders, complete_batch, release_batch
+from .icons import available_icons, is_built as icons_built
+from .ids import new_matchroom_id
+from .images import SLIDE_SIZES, generate_derivatives
+from .product_types import ProductType
+from .pagination import paginate_keyset
+from .screenshot_hashes import earlier_matches
+from .queries import cached_count, prefix_q, status_count, status_summary, status_total
+from .user_lookup import LOOKUP_PAGE_SIZE, lookup_users, with_lookup_stats
+
+
+def matching_users(search):
+    """Subquery of every user matching ``search`` as in the user list (core.user_lookup)"""
+    return lookup_users(search).values('pk')
 
 
 @staff_member_required
 def custom_admin_dashboard(request):
     """Main admin dashboard with statistics"""
-    
-    # Get statistics
-    total_users = User.objects.count()
-    total_tournaments = Tournament.objects.count()
-    active_tournaments = Tournament.objects.filter(status='ongoing').count()
-    
-    pending_payments = PaymentRequest.objects.filter(status='pending').count()
-    pending_orders = Order.objects.filter(status='pending').count()
-    
-    total_revenue = PaymentRequest.objects.filter(
-        status='approved'
-    ).aggregate(total=Sum('payment_amount'))['total'] or 0
-    
-    # Recent activity
-    recent_users = User.objects.order_by('-date_joined')[:5]
-    recent_payments = PaymentRequest.objects.order_by('-created_at')[:5]
-    recent_orders = Order.objects.order_by('-created_at')[:5]
-    
-    # This week stats
-    week_ago = timezone.now() - timedelta(days=7)
-    new_users_week = User.objects.filter(date_joined__gte=week_ago).count()
-    payments_week = PaymentRequest.objects.filter(
-        created_at__gte=week_ago,
-        status='approved'
-    ).count()
-    
-    context = {
-        'total_users': total_users,
-        'total_tournaments': total_tournaments,
-        'active_tournaments': active_tournaments,
-        'pending_payments': pending_payments,
-        'pending_orders': pending_orders,
-        'total_revenue': total_revenue,
-        'recent_users': recent_users,
-        'recent_payments': recent_payments,
-        'recent_orders': recent_orders,
-        'new_users_week': new_users_week,
-        'payments_week': payments_week,
-    }
+    context = dict(dashboard_stats())
+    context['cache_stats'] = cache_stats()
     
     return render(request, 'custom_admin/dashboard.html', context)
 
@@ -69,10 +51,17 @@ def payment_management(request):
     """Manage payment requests"""
     status_filter = request.GET.get('status', 'pending')
     
-    payments = PaymentRequest.objects.filter(status=status_filter).order_by('-created_at')
+    page = paginate_keyset(
+        PaymentRequest.objects.filter(status=status_filter).select_related('user'), request.GET
+    )
+    # Only this page's screenshots are compared
+    reused = earlier_matches([payment.id for payment in page])
+    for payment in page:
+        payment.screenshot_matches = reused.get(payment.id, [])
     
     context = {
-        'payments': payments,
+        'payments': page,
+        'page': page,
         'status_filter': status_filter,
         'pending_count': PaymentRequest.objects.filter(status='pending').count(),
     }
@@ -210,30 +199,97 @@ def update_order_status(request, order_id):
     return redirect('custom_admin:orders')
 
 
+# Largest batch an operator can claim at once
+MAX_FULFILMENT_BATCH = 500
+
+
+@staff_member_required
+def fulfilment_batches(request):
+    """Claim pending orders of one game into a fulfilment batch"""
+    if request.method == 'POST':
+        game = get_object_or_404(Game, id=request.POST.get('game'))
+        try:
+            size = int(request.POST.get('size', 50))
+        except ValueError:
+            size = 50
+        size = max(1, min(size, MAX_FULFILMENT_BATCH))
+
+        batch = claim_orders(game, request.user, size)
+        if batch is None:
+            messages.warning(request, f'No unclaimed pending {game.name} orders left')
+            return redirect('custom_admin:fulfilment_batches')
+
+        messages.success(request, f'Claimed {batch.orders.count()} {game.name} orders into batch #{batch.id}')
+        return redirect('custom_admin:fulfilment_batch', batch_id=batch.id)
+
+    pending_by_game = {
+        row['item__game']: row['count']
+        for row in Order.objects.filter(status='pending', fulfilment__isnull=True)
+        .order_by().values('item__game').annotate(count=Count('pk'))
+    }
+    games = list(Game.objects.filter(is_active=True).order_by('display_order', 'name'))
+    for game in games:
+        game.pending_orders = pending_by_game.get(game.id, 0)
+
+    context = {
+        'games': games,
+        'open_batches': FulfilmentBatch.objects.filter(status='open').select_related('game', 'operator')
+        .annotate(order_count=Count('claims')),
+        'max_batch_size': MAX_FULFILMENT_BATCH,
+    }
+
+    return render(request, 'custom_admin/fulfilment_batches.html', context)
+
+
+@staff_member_required
+def fulfilment_batch(request, batch_id):
+    """Delivery sheet of one batch; complete or release it in one step"""
+    batch = get_object_or_404(FulfilmentBatch.objects.select_related('game', 'operator'), id=batch_id)
+
+    if request.method == 'POST' and batch.status == 'open':
+        action = request.POST.get('action')
+        if action == 'complete':
+            completed = complete_batch(batch)
+            messages.success(request, f'Batch #{batch.id}: {completed} orders completed')
+            return redirect('custom_admin:fulfilment_batches')
+        if action == 'release':
+            released = release_batch(batch)
+            messages.success(request, f'Batch #{batch.id}: {released} orders returned to the queue')
+            return redirect('custom_admin:fulfilment_batches')
+
+    sheet = batch_sheet(batch)
+
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="batch-{batch.id}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['In-Game ID', 'In-Game Name', 'Item', 'Quantity', 'Orders', 'Order IDs'])
+        for row in sheet:
+            writer.writerow([
+                row['in_game_id'], row['in_game_name'], row['item__name'],
+                row['quantity'], row['orders'], ' '.join(row['order_ids']),
+            ])
+        return response
+
+    context = {
+        'batch': batch,
+        'sheet': sheet,
+        'order_count': sum(row['orders'] for row in sheet),
+    }
+
+    return render(request, 'custom_admin/fulfilment_batch_detail.html', context)
+
+
 @staff_member_required
 def store_management(request):
     """Manage store items with game categories"""
-    # Get all games dynamically from database
-    games = Game.objects.all().prefetch_related('items')
-    
-    game_categories = {}
-    for game in games:
-        game_categories[game.slug] = {
-            'name': game.name,
-            'title': f'{game.name.upper()} PRODUCTS',
-            'types': game.get_product_types_list(),
-            'items': game.items.all().order_by('-created_at'),
-            'url_param': game.slug,
-            'icon': game.icon,
-            'image': game.image.url if game.image else None,
-            'total': game.items.count(),
-            'active': game.items.filter(is_active=True).count(),
-        }
+    game_categories = get_catalog()
+    counts = item_counts()
     
     context = {
         'game_categories': game_categories,
-        'total_items': StoreItem.objects.count(),
-        'active_count': StoreItem.objects.filter(is_active=True).count(),
+        'total_items': counts['total'],
+        'active_count': counts['active'],
     }
     
     return render(request, 'custom_admin/store.html', context)
@@ -256,7 +312,7 @@ def add_store_item(request):
             featured = False
             is_active = True  # Active by default
             
-            StoreItem.objects.create(
+            item = StoreItem.objects.create(
                 name=name,
                 game=game,
                 description=description,
@@ -266,6 +322,7 @@ def add_store_item(request):
                 featured=featured,
                 is_active=is_active
             )
+            set_item_product_types(item, request.POST.getlist('product_types'))
             
             messages.success(request, f'Store item "{name}" created successfully!')
             return redirect('custom_admin:store')
@@ -274,7 +331,7 @@ def add_store_item(request):
             messages.error(request, f'Error creating item: {str(e)}')
     
     context = {
-        'games': Game.objects.filter(is_active=True)
+        'games': Game.objects.filter(is_active=True).prefetch_related('types')
     }
     
     return render(request, 'custom_admin/add_store_item.html', context)
@@ -299,6 +356,7 @@ def edit_store_item(request, item_id):
                 item.image = request.FILES.get('image')
             
             item.save()
+            set_item_product_types(item, request.POST.getlist('product_types'))
             
             messages.success(request, f'Store item "{item.name}" updated successfully!')
             return redirect('custom_admin:store')
@@ -308,12 +366,20 @@ def edit_store_item(request, item_id):
     
     context = {
         'item': item,
-        'games': Game.objects.all()
+        'games': Game.objects.all().prefetch_related('types'),
+        'item_type_ids': set(item.product_types.values_list('pk', flat=True)),
     }
     
     return render(request, 'custom_admin/edit_store_item.html', context)
 
 
+def set_item_product_types(item, type_ids):
+    """Tag ``item`` with the submitted types that belong to its game"""
+    item.product_types.set(
+        ProductType.objects.filter(game=item.game, pk__in=[pk for pk in type_ids if pk.isdigit()])
+    )
+
+
 @staff_member_required
 def toggle_item_status(request, item_id):
     """Toggle store item active status"""
@@ -370,6 +436,9 @@ def website_settings(request):
 
             if slider_formset.is_valid():
                 slider_formset.save()
+                for form in slider_formset.forms:
+                    if 'image' in form.changed_data and form.instance.image:
+                        generate_derivatives(form.instance.image, SLIDE_SIZES)
                 messages.success(request, 'Slider images updated successfully!')
                 return redirect('custom_admin:settings')
 
@@ -389,17 +458,18 @@ def website_settings(request):
 @staff_member_required
 def user_management(request):
     """Manage users"""
-    search = request.GET.get('search', '')
-    
-    users = User.objects.all()
-    if search:
-        users = users.filter(username__icontains=search) | users.filter(email__icontains=search)
+    search = request.GET.get('search', '').strip()
     
-    users = users.order_by('-date_joined')[:50]
+    users = lookup_users(search) if search else User.objects.all()
+    page = paginate_keyset(
+        with_lookup_stats(users), request.GET,
+        field='date_joined', per_page=LOOKUP_PAGE_SIZE
+    )
     
     context = {
-        'users': users,
-        'total_users': User.objects.count(),
+        'users': page,
+        'page': page,
+        'total_users': cached_count(User),
         'search': search,
     }
     
@@ -555,7 +625,7 @@ def game_management(request):
     games = Game.objects.all().annotate(
         item_count=Count('items'),
         active_items=Count('items', filter=Q(items__is_active=True))
-    )
+    ).prefetch_related('types')
     
     context = {
         'games': games,
@@ -566,6 +636,12 @@ def game_management(request):
     return render(request, 'custom_admin/games.html', context)
 
 
+def warn_missing_icon(request, icon):
+    """The self-hosted icon subset only has icons that existed when it was built"""
+    if icons_built() and icon not in available_icons():
+        messages.warning(request, f'Icon "{icon}" is not in the icon set yet; run manage.py build_icons')
+
+
 @staff_member_required
 def add_game(request):
     """Add new game category"""
@@ -610,6 +686,7 @@ def add_game(request):
             )
             
             messages.success(request, f'Game category "{name}" created successfully!')
+            warn_missing_icon(request, icon)
             return redirect('custom_admin:games')
             
         except Exception as e:
@@ -649,6 +726,7 @@ def edit_game(request, game_id):
             game.save()
             
             messages.success(request, f'Game category "{game.name}" updated successfully!')
+            warn_missing_icon(request, game.icon)
             return redirect('custom_admin:games')
             
         except Exception as e:
@@ -817,7 +895,7 @@ def delete_full_tournament(request, tournament_id):
 def withdrawal_management(request):
     """Manage withdrawal requests"""
     status_filter = request.GET.get('status', 'all')
-    search = request.GET.get('search', '')
+    search = request.GET.get('search', '').strip()
     
     withdrawals = WithdrawalRequest.objects.all().select_related('user', 'processed_by')
     
@@ -825,38 +903,27 @@ def withdrawal_management(request):
         withdrawals = withdrawals.filter(status=status_filter)
     
     if search:
-        withdrawals = withdrawals.filter(
-            Q(user__username__icontains=search) |
-            Q(user__email__icontains=search) |
-            Q(payment_method__icontains=search)
-        )
+        matches = Q(user__in=matching_users(search)) | prefix_q('payment_method', search)
+        if search.lstrip('#').isdigit():
+            matches |= Q(pk=int(search.lstrip('#')))
+        withdrawals = withdrawals.filter(matches)
     
-    withdrawals = withdrawals.order_by('-created_at')
+    page = paginate_keyset(withdrawals, request.GET)
     
     # Statistics
-    total_withdrawals = WithdrawalRequest.objects.count()
-    pending_withdrawals = WithdrawalRequest.objects.filter(status='pending').count()
-    approved_withdrawals = WithdrawalRequest.objects.filter(status='approved').count()
-    rejected_withdrawals = WithdrawalRequest.objects.filter(status='rejected').count()
-    
-    total_amount_pending = WithdrawalRequest.objects.filter(status='pending').aggregate(
-        total=Sum('amount')
-    )['total'] or 0
-    
-    total_amount_approved = WithdrawalRequest.objects.filter(status='approved').aggregate(
-        total=Sum('amount')
-    )['total'] or 0
+    summary = status_summary(WithdrawalRequest, sum_field='amount')
     
     context = {
-        'withdrawals': withdrawals,
+        'withdrawals': page,
+        'page': page,
         'status_filter': status_filter,
         'search': search,
-        'total_withdrawals': total_withdrawals,
-        'pending_withdrawals': pending_withdrawals,
-        'approved_withdrawals': approved_withdrawals,
-        'rejected_withdrawals': rejected_withdrawals,
-        'total_amount_pending': total_amount_pending,
-        'total_amount_approved': total_amount_approved,
+        'total_withdrawals': sum(row['count'] for row in summary.values()),
+        'pending_withdrawals': status_count(summary, 'pending'),
+        'approved_withdrawals': status_count(summary, 'approved'),
+        'rejected_withdrawals': status_count(summary, 'rejected'),
+        'total_amount_pending': status_total(summary, 'pending'),
+        'total_amount_approved': status_total(summary, 'approved'),
     }
     
     return render(request, 'custom_admin/withdrawals.html', context)
@@ -960,6 +1027,7 @@ def create_full_tournament(request):
             
             # Create tournament
             tournament = FullTournament.objects.create(
+                matchroom_id=new_matchroom_id(),
                 title=title,
                 game=game,
                 team_type=team_type,
@@ -991,37 +1059,39 @@ def create_full_tournament(request):
 def chat_management(request):
     """Manage chat messages from users"""
     status_filter = request.GET.get('status', 'all')
-    search = request.GET.get('search', '')
+    search = request.GET.get('search', '').strip()
     
-    chats = ChatMessage.objects.all().select_related('user', 'replied_by').order_by('-created_at')
+    chats = ChatMessage.objects.all().select_related('user', 'replied_by')
     
     if status_filter != 'all':
         chats = chats.filter(status=status_filter)
     
     if search:
-        chats = chats.filter(
-            Q(user__username__icontains=search) |
-            Q(user__email__icontains=search) |
-            Q(subject__icontains=search) |
-            Q(message__icontains=search)
-        )
+        # Full-text hits over subject/message/reply, and messages from
+        # matching users; every hit, paged like the unfiltered inbox
+        hits = search_index.matching('chat', search)
+        matches = Q(user__in=matching_users(search))
+        if hits is not None:
+            matches |= Q(pk__in=hits)
+        if search.lstrip('#').isdigit():
+            matches |= Q(pk=int(search.lstrip('#')))
+        chats = chats.filter(matches)
+    
+    page = paginate_keyset(chats, request.GET)
     
     # Statistics
-    total_chats = ChatMessage.objects.count()
-    new_chats = ChatMessage.objects.filter(status='new').count()
-    read_chats = ChatMessage.objects.filter(status='read').count()
-    replied_chats = ChatMessage.objects.filter(status='replied').count()
-    resolved_chats = ChatMessage.objects.filter(status='resolved').count()
+    summary = status_summary(ChatMessage)
     
     context = {
-        'chats': chats,
+        'chats': page,
+        'page': page,
         'status_filter': status_filter,
         'search': search,
-        'total_chats': total_chats,
-        'new_chats': new_chats,
-        'read_chats': read_chats,
-        'replied_chats': replied_chats,
-        'resolved_chats': resolved_chats,
+        'total_chats': sum(row['count'] for row in summary.values()),
+        'new_chats': status_count(summary, 'new'),
+        'read_chats': status_count(summary, 'read'),
+        'replied_chats': status_count(summary, 'replied'),
+        'resolved_chats': status_count(summary, 'resolved'),
     }
     return render(request, 'custom_admin/chat_management.html', context)
 
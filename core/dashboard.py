@@ -0,0 +1,53 @@
+"""
+Admin dashboard statistics
+Counts, revenue and recent activity for custom_admin/dashboard.html,
+cached in the core.caching namespace 'dashboard'. Payment, order and
+tournament changes drop it (core.signals); new users show up within
+DASHBOARD_TIMEOUT.
+"""
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from .caching import get_or_compute, invalidate
+from .models import Order, PaymentRequest, Tournament, User
+
+
+DASHBOARD_NAMESPACE = 'dashboard'
+DASHBOARD_TIMEOUT = 60  # seconds
+
+RECENT_ACTIVITY = 5
+
+
+def build_dashboard_stats():
+    week_ago = timezone.now() - timedelta(days=7)
+    return {
+        'total_users': User.objects.count(),
+        'total_tournaments': Tournament.objects.count(),
+        'active_tournaments': Tournament.objects.filter(status='ongoing').count(),
+        'pending_payments': PaymentRequest.objects.filter(status='pending').count(),
+        'pending_orders': Order.objects.filter(status='pending').count(),
+        'total_revenue': PaymentRequest.objects.filter(
+            status='approved'
+        ).aggregate(total=Sum('payment_amount'))['total'] or 0,
+        # Recent activity
+        'recent_users': list(User.objects.order_by('-date_joined')[:RECENT_ACTIVITY]),
+        'recent_payments': list(
+            PaymentRequest.objects.select_related('user').order_by('-created_at')[:RECENT_ACTIVITY]
+        ),
+        'recent_orders': list(
+            Order.objects.select_related('user', 'item').order_by('-created_at')[:RECENT_ACTIVITY]
+        ),
+        # This week stats
+        'new_users_week': User.objects.filter(date_joined__gte=week_ago).count(),
+        'payments_week': PaymentRequest.objects.filter(created_at__gte=week_ago, status='approved').count(),
+    }
+
+
+def dashboard_stats():
+    return get_or_compute(DASHBOARD_NAMESPACE, 'stats', build_dashboard_stats, DASHBOARD_TIMEOUT)
+
+
+def invalidate_dashboard():
+    invalidate(DASHBOARD_NAMESPACE)
@@ -0,0 +1,297 @@
+"""
+SQLite to PostgreSQL copy
+Used by ``manage.py copy_to_postgresql``. Every concrete model (core's
+and the contrib apps' they point at, including many-to-many tables) is
+copied from a source database alias to a target PostgreSQL alias whose
+schema was created with ``migrate``:
+
+1. Copy: rows are read in primary key order, BATCH_SIZE at a time
+   (keyset pagination, so each batch is an index range scan), and written
+   with COPY. Each batch commits together with its row in the progress
+   table, so an interrupted run resumes after the last committed batch.
+   The first run empties the target tables (``migrate`` fills
+   contenttypes and permissions with its own ids); later runs pick up
+   the rows added since. Tables that reference themselves
+   (User.referred_by) are copied in a single transaction, as a row may
+   point at one in a later batch.
+2. Sync, dependent tables first: the same batches are compared with the
+   target by row count and an order-independent checksum; batches that
+   differ (rows changed or deleted since they were copied) are deleted
+   and copied again.
+3. Sequences are reset and the full-text search tables rebuilt.
+
+Run it once while the site is up, then again with the site stopped:
+the second run only rewrites what changed, so the downtime lasts about
+as long as reading the database once.
+"""
+import hashlib
+import json
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connections, transaction
+
+from . import search
+
+
+BATCH_SIZE = 5000
+
+PROGRESS_TABLE = 'core_dbcopy_progress'
+
+CHECKSUM_MODULUS = 2 ** 256
+
+
+def register_database(alias, settings_dict):
+    """Add a database alias at runtime (e.g. a second SQLite file)"""
+    configured = connections.configure_settings({
+        'default': connections.settings['default'],
+        alias: settings_dict,
+    })
+    connections.settings[alias] = configured[alias]
+
+
+def copied_models():
+    """Concrete models in foreign key order, referenced tables first"""
+    models = [
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+    ]
+    ordered, seen = [], set()
+
+    def visit(model, path):
+        if model in seen or model in path:
+            return
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model is not model:
+                visit(field.related_model._meta.concrete_model, path | {model})
+        seen.add(model)
+        ordered.append(model)
+
+    for model in models:
+        visit(model, frozenset())
+    return [model for model in ordered if model in models]
+
+
+def is_self_referencing(model):
+    return any(field.is_relation and field.related_model is model for field in model._meta.concrete_fields)
+
+
+def has_integer_pk(model):
+    return model._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField',
+                                                  'BigIntegerField', 'ForeignKey', 'OneToOneField')
+
+
+def row_checksum(row):
+    digest = hashlib.sha256(json.dumps(row, default=str, sort_keys=True).encode()).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def checksum(rows):
+    """(count, checksum) of ``rows``, independent of their order"""
+    count, total = 0, 0
+    for row in rows:
+        count += 1
+        total = (total + row_checksum(row)) % CHECKSUM_MODULUS
+    return count, total
+
+
+class TableCopy:
+    """Copies one model's table from ``source`` to ``target`` (aliases)"""
+
+    def __init__(self, model, source, target, batch_size=BATCH_SIZE):
+        self.model = model
+        self.source, self.target = source, target
+        self.batch_size = batch_size
+        self.fields = model._meta.concrete_fields
+        self.table = model._meta.db_table
+
+    def rows(self, alias):
+        names = [field.attname for field in self.fields]
+        return self.model._base_manager.using(alias).order_by('pk').values_list(*names)
+
+    def batches(self, after=None):
+        """Source rows in primary key order, ``batch_size`` at a time"""
+        while True:
+            queryset = self.rows(self.source)
+            if after is not None:
+                queryset = queryset.filter(pk__gt=after)
+            batch = list(queryset[:self.batch_size])
+            if not batch:
+                return
+            yield batch
+            after = batch[-1][self.pk_index]
+
+    @property
+    def pk_index(self):
+        return self.fields.index(self.model._meta.pk)
+
+    def write(self, batch):
+        """COPY ``batch`` into the target table"""
+        connection = connections[self.target]
+        qn = connection.ops.quote_name
+        columns = ', '.join(qn(field.column) for field in self.fields)
+        prepared = [
+            [field.get_db_prep_save(value, connection) for field, value in zip(self.fields, row)]
+            for row in batch
+        ]
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy'):  # psycopg 3
+                with raw.copy(f'COPY {qn(self.table)} ({columns}) FROM STDIN') as copy:
+                    for row in prepared:
+                        copy.write_row(row)
+            else:  # psycopg2: plain multi-row inserts
+                placeholders = ', '.join(['%s'] * len(self.fields))
+                cursor.executemany(f'INSERT INTO {qn(self.table)} ({columns}) VALUES ({placeholders})', prepared)
+
+    def target_window(self, low, high):
+        rows = self.rows(self.target)
+        if low is not None:
+            rows = rows.filter(pk__gt=low)
+        if high is not None:
+            rows = rows.filter(pk__lte=high)
+        return rows
+
+    def delete_window(self, low, high):
+        """Delete target rows in (low, high] with plain SQL: no cascades or signals"""
+        connection = connections[self.target]
+        column = f'{connection.ops.quote_name(self.table)}.{connection.ops.quote_name(self.model._meta.pk.column)}'
+        conditions, params = ['1 = 1'], []
+        if low is not None:
+            conditions.append(f'{column} > %s')
+            params.append(low)
+        if high is not None:
+            conditions.append(f'{column} <= %s')
+            params.append(high)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {connection.ops.quote_name(self.table)} WHERE {" AND ".join(conditions)}', params
+            )
+
+    def copy(self, progress):
+        """Copy the rows after the last committed batch; returns the number copied"""
+        state = progress.get(self.model)
+        after, copied = state['last_pk'], 0
+        if is_self_referencing(self.model):
+            with transaction.atomic(using=self.target):
+                self.delete_window(after, None)
+                for batch in self.batches(after):
+                    self.write(batch)
+                    copied += len(batch)
+                    after = batch[-1][self.pk_index]
+                progress.save(self.model, after, state['copied'] + copied, done=True)
+            return copied
+
+        for batch in self.batches(after):
+            with transaction.atomic(using=self.target):
+                self.write(batch)
+                copied += len(batch)
+                after = batch[-1][self.pk_index]
+                progress.save(self.model, after, state['copied'] + copied)
+        progress.save(self.model, after, state['copied'] + copied, done=True)
+        return copied
+
+    def sync(self):
+        """Compare the tables batch by batch and recopy batches that differ; returns (rows, recopied)"""
+        if not has_integer_pk(self.model):
+            # Text keys sort differently on the two databases: one window
+            return self._sync_window(None, None, list(self.rows(self.source)))
+
+        rows = recopied = 0
+        low = None
+        for batch in self.batches():
+            high = batch[-1][self.pk_index]
+            count, changed = self._sync_window(low, high, batch)
+            rows, recopied = rows + count, recopied + changed
+            low = high
+        # Target rows past the end of the source were deleted from it
+        _, changed = self._sync_window(low, None, [])
+        return rows, recopied + changed
+
+    def _sync_window(self, low, high, source_rows):
+        """Make target rows in (low, high] match ``source_rows``"""
+        expected = checksum(source_rows)
+        with transaction.atomic(using=self.target):
+            if checksum(self.target_window(low, high).iterator(chunk_size=self.batch_size)) == expected:
+                return expected[0], 0
+            self.delete_window(low, high)
+            if source_rows:
+                self.write(source_rows)
+        return expected[0], expected[0]
+
+    def verify(self):
+        """(source (count, checksum), target (count, checksum))"""
+        return tuple(
+            checksum(self.rows(alias).iterator(chunk_size=self.batch_size))
+            for alias in (self.source, self.target)
+        )
+
+
+class Progress:
+    """Per-table copy progress, kept in the target database"""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.connection = connections[alias]
+
+    def create(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ('
+                'table_name varchar(255) PRIMARY KEY, last_pk text, '
+                'copied bigint NOT NULL DEFAULT 0, done boolean NOT NULL DEFAULT false)'
+            )
+
+    def drop(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {PROGRESS_TABLE}')
+
+    def is_started(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {PROGRESS_TABLE}')
+            return cursor.fetchone()[0] > 0
+
+    def start(self, models):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {PROGRESS_TABLE} (table_name) VALUES (%s) ON CONFLICT DO NOTHING',
+                [(model._meta.db_table,) for model in models],
+            )
+
+    def get(self, model):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT last_pk, copied, done FROM {PROGRESS_TABLE} WHERE table_name = %s', [model._meta.db_table]
+            )
+            last_pk, copied, done = cursor.fetchone()
+        return {
+            'last_pk': None if last_pk is None else model._meta.pk.to_python(last_pk),
+            'copied': copied,
+            'done': done,
+        }
+
+    def save(self, model, last_pk, copied, done=False):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {PROGRESS_TABLE} SET last_pk = %s, copied = %s, done = %s WHERE table_name = %s',
+                [None if last_pk is None else str(last_pk), copied, done, model._meta.db_table],
+            )
+
+
+def truncate(alias, models):
+    connection = connections[alias]
+    tables = ', '.join(connection.ops.quote_name(model._meta.db_table) for model in models)
+    with connection.cursor() as cursor:
+        cursor.execute(f'TRUNCATE {tables} RESTART IDENTITY CASCADE')
+
+
+def reset_sequences(alias, models):
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def rebuild_search(alias):
+    for name in search.SEARCH_INDEXES:
+        search.rebuild_index(name, connections[alias])
@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
+from .ids import assign_user_ids, new_order_id
 from .models import User, TournamentParticipant, PaymentRequest, Order, SliderImage, WithdrawalRequest, ChatMessage
 
 
@@ -52,6 +53,10 @@ class UserRegistrationForm(forms.ModelForm):
             raise forms.ValidationError("Passwords don't match!")
         
         return cleaned_data
+    
+    def save(self, commit=True):
+        assign_user_ids(self.instance)
+        return super().save(commit)
 
 
 class UserLoginForm(forms.Form):
@@ -157,6 +162,11 @@ class OrderForm(forms.ModelForm):
                 'placeholder': 'Your In-Game Name'
             }),
         }
+    
+    def save(self, commit=True):
+        if not self.instance.order_id:
+            self.instance.order_id = new_order_id()
+        return super().save(commit)
 
 
 class SliderImageForm(forms.ModelForm):
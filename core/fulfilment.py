@@ -0,0 +1,155 @@
+"""
+Order fulfilment batches
+An operator claims up to N pending orders of one game in a single step,
+tops them up from an exported sheet grouped by in-game ID, then closes
+the whole batch with one UPDATE and one bulk INSERT of notifications.
+
+Claims can't overlap: every claimed order gets a FulfilmentBatchOrder
+row and ``order`` is unique on that table, so when two operators race
+for the same orders the database keeps exactly one link per order and
+the loser's INSERT is skipped (ON CONFLICT DO NOTHING).
+"""
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+
+class FulfilmentBatch(models.Model):
+    """A set of orders claimed by one operator for delivery"""
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('completed', 'Completed'),
+        ('released', 'Released'),
+    ]
+
+    game = models.ForeignKey('core.Game', on_delete=models.PROTECT, related_name='fulfilment_batches')
+    operator = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='fulfilment_batches'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    created_at = models.DateTimeField(auto_now_add=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'core'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'Batch #{self.pk} ({self.game})'
+
+    @property
+    def orders(self):
+        from .models import Order
+        return Order.objects.filter(fulfilment__batch=self)
+
+
+class FulfilmentBatchOrder(models.Model):
+    """Claim of one order by one batch; ``order`` is unique"""
+    batch = models.ForeignKey(FulfilmentBatch, on_delete=models.CASCADE, related_name='claims')
+    order = models.OneToOneField('core.Order', on_delete=models.CASCADE, related_name='fulfilment')
+
+    class Meta:
+        app_label = 'core'
+
+
+def claim_orders(game, operator, size):
+    """
+    Claim up to ``size`` of the oldest unclaimed pending orders for
+    ``game`` into a new batch and mark them processing. Returns the batch,
+    or None when nothing was left to claim.
+    """
+    from .models import Order
+
+    with transaction.atomic():
+        candidates = Order.objects.filter(
+            status='pending', item__game=game, fulfilment__isnull=True
+        ).order_by('created_at', 'pk')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True, of=('self',))
+        candidate_ids = list(candidates.values_list('pk', flat=True)[:size])
+        if not candidate_ids:
+            return None
+
+        batch = FulfilmentBatch.objects.create(game=game, operator=operator)
+        FulfilmentBatchOrder.objects.bulk_create(
+            [FulfilmentBatchOrder(batch=batch, order_id=pk) for pk in candidate_ids],
+            ignore_conflicts=True,
+        )
+        claimed = Order.objects.filter(fulfilment__batch=batch, status='pending')
+        if not claimed.update(status='processing'):
+            batch.delete()
+            return None
+
+    notify_orders(batch.orders, 'Order Processing', 'Your order {order_id} is being processed.')
+    return batch
+
+
+def complete_batch(batch):
+    """Mark every processing order of ``batch`` completed in one UPDATE"""
+    with transaction.atomic():
+        orders = batch.orders.filter(status='processing')
+        completed_ids = list(orders.values_list('pk', flat=True))
+        orders.update(status='completed', completed_at=timezone.now())
+        batch.status = 'completed'
+        batch.closed_at = timezone.now()
+        batch.save(update_fields=['status', 'closed_at'])
+
+    from .models import Order
+    notify_orders(
+        Order.objects.filter(pk__in=completed_ids),
+        'Order Completed',
+        'Your order {order_id} has been delivered to your game account!',
+    )
+    return len(completed_ids)
+
+
+def release_batch(batch):
+    """Hand unfinished orders of ``batch`` back to the pending queue"""
+    with transaction.atomic():
+        orders = batch.orders.filter(status='processing')
+        released = orders.update(status='pending')
+        FulfilmentBatchOrder.objects.filter(batch=batch, order__status='pending').delete()
+        batch.status = 'released'
+        batch.closed_at = timezone.now()
+        batch.save(update_fields=['status', 'closed_at'])
+    return released
+
+
+def notify_orders(orders, title, message):
+    """One bulk INSERT of order notifications; ``message`` may use {order_id}"""
+    from .models import Notification
+
+    Notification.objects.bulk_create([
+        Notification(
+            user_id=user_id,
+            notification_type='order',
+            title=title,
+            message=message.format(order_id=order_id),
+            link='/orders/',
+        )
+        for user_id, order_id in orders.values_list('user_id', 'order_id')
+    ], batch_size=500)
+
+
+def batch_sheet(batch):
+    """
+    Delivery sheet rows grouped by (in-game ID, item): one top-up per
+    player per item, with the quantity summed and the order IDs listed.
+    """
+    rows = (
+        batch.orders.order_by()
+        .values('in_game_id', 'in_game_name', 'item__name')
+        .annotate(orders=Count('pk'), quantity=Sum('quantity'))
+        .order_by('in_game_id', 'item__name')
+    )
+    order_ids = {}
+    for in_game_id, item_name, order_id in batch.orders.order_by('created_at').values_list(
+        'in_game_id', 'item__name', 'order_id'
+    ):
+        order_ids.setdefault((in_game_id, item_name), []).append(order_id)
+
+    return [
+        dict(row, order_ids=order_ids.get((row['in_game_id'], row['item__name']), []))
+        for row in rows
+    ]
@@ -0,0 +1,98 @@
+"""
+Home page
+core/home.html is cached at three levels:
+
+- each section's data, in its own core.caching namespace; core.signals
+  bumps a namespace when its rows change (slides, tournaments and their
+  participants, store items)
+- each section's rendered HTML, a {% cache %} fragment keyed on that
+  namespace's version, so the queries only run when the fragment is stale
+- the whole page (core.page_cache), one copy for anonymous visitors and
+  one shared by signed-in users with their coins, name and notification
+  count filled in afterwards
+
+The leaderboard is shared with the leaderboard page and only expires.
+"""
+from django.shortcuts import render
+from django.utils.functional import SimpleLazyObject
+
+from .caching import get_or_compute, invalidate, namespace_versions
+from .leaderboard import LEADERBOARD_NAMESPACE, LEADERBOARD_TIMEOUT, top_players
+from .models import SliderImage, StoreItem, Tournament
+from .page_cache import cached_page
+
+
+SLIDES_NAMESPACE = 'home.slides'
+TOURNAMENTS_NAMESPACE = 'home.tournaments'
+FEATURED_NAMESPACE = 'home.featured'
+
+# Fragment name in home.html: namespace it is keyed on
+SECTIONS = {
+    'slides': SLIDES_NAMESPACE,
+    'tournaments': TOURNAMENTS_NAMESPACE,
+    'featured': FEATURED_NAMESPACE,
+    'leaderboard': LEADERBOARD_NAMESPACE,
+}
+
+HOME_TIMEOUT = 10 * 60  # seconds; saves invalidate it sooner
+PAGE_TIMEOUT = LEADERBOARD_TIMEOUT
+
+UPCOMING_TOURNAMENTS = 6
+FEATURED_ITEMS = 8
+LEADERBOARD_PLAYERS = 5
+
+
+def slider_images():
+    return get_or_compute(SLIDES_NAMESPACE, 'slides', lambda: list(
+        SliderImage.objects.filter(is_active=True).order_by('position')
+    ), HOME_TIMEOUT)
+
+
+def upcoming_tournaments():
+    return get_or_compute(TOURNAMENTS_NAMESPACE, 'upcoming', lambda: list(
+        Tournament.objects.filter(status='upcoming').order_by('tournament_date')[:UPCOMING_TOURNAMENTS]
+    ), HOME_TIMEOUT)
+
+
+def featured_items():
+    return get_or_compute(FEATURED_NAMESPACE, 'items', lambda: list(
+        StoreItem.objects.filter(is_active=True, featured=True).order_by('-created_at')[:FEATURED_ITEMS]
+    ), HOME_TIMEOUT)
+
+
+def invalidate_slides():
+    invalidate(SLIDES_NAMESPACE)
+
+
+def invalidate_tournaments():
+    invalidate(TOURNAMENTS_NAMESPACE)
+
+
+def invalidate_featured():
+    invalidate(FEATURED_NAMESPACE)
+
+
+def section_versions():
+    versions = namespace_versions(*SECTIONS.values())
+    return {name: versions[namespace] for name, namespace in SECTIONS.items()}
+
+
+def home_page_context():
+    """
+    Template context for core/home.html. The sections are lazy: they're
+    only loaded when their fragment isn't cached.
+    """
+    return {
+        'slider_images': SimpleLazyObject(slider_images),
+        'upcoming_tournaments': SimpleLazyObject(upcoming_tournaments),
+        'featured_items': SimpleLazyObject(featured_items),
+        'leaderboard': SimpleLazyObject(lambda: top_players(LEADERBOARD_PLAYERS)),
+        'home_versions': section_versions(),
+        'fragment_timeout': HOME_TIMEOUT,
+        'leaderboard_timeout': LEADERBOARD_TIMEOUT,
+    }
+
+
+@cached_page(SECTIONS.values(), PAGE_TIMEOUT)
+def home_page(request):
+    return render(request, 'core/home.html', home_page_context())
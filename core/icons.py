@@ -0,0 +1,165 @@
+"""
+Self-hosted icons
+Instead of the whole Font Awesome stylesheet and fonts from a CDN, pages
+load static/css/icons.css, which only has the icons the site uses: every
+``fa-*`` class in the templates and scripts plus the icon names stored in
+Game.icon. Each icon is an inline SVG used as a CSS mask, so the existing
+``<i class="fas fa-trophy"></i>`` markup keeps working, takes the text
+colour and costs no extra request.
+
+``manage.py build_icons --source <fontawesome-free>`` regenerates the file
+from an unpacked Font Awesome Free package (the ``svgs/`` directory and
+``metadata/icons.json`` for the v5 names still used here, e.g. fa-edit).
+Until it has been built, {% icon_css %} links the CDN stylesheet.
+"""
+import json
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+
+
+FONT_AWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css'
+
+ICONS_CSS = 'css/icons.css'
+
+# class: svgs/ subdirectory
+STYLES = {
+    'fas': 'solid', 'fa-solid': 'solid', 'fa': 'solid',
+    'far': 'regular', 'fa-regular': 'regular',
+    'fab': 'brands', 'fa-brands': 'brands',
+}
+
+# fa-* classes that aren't icons
+MODIFIERS = {
+    'solid', 'regular', 'brands', 'fw', 'xs', 'sm', 'lg', 'xl',
+    '1x', '2x', '3x', '4x', '5x', 'spin', 'pulse',
+}
+
+SCANNED_DIRS = ('templates', 'static/js')
+SCANNED_SUFFIXES = ('.html', '.js')
+
+_CLASS_ATTR_RE = re.compile(r'''class\s*=\s*(["'])(.*?)\1''', re.S)
+_VIEWBOX_RE = re.compile(r'viewBox="0 0 (\d+) (\d+)"')
+_SVG_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+
+BASE_CSS = """\
+.fa,.fas,.far,.fab,.fa-solid,.fa-regular,.fa-brands{display:inline-block;height:1em;width:1em;line-height:1;vertical-align:-.125em}
+.fa::before,.fas::before,.far::before,.fab::before,.fa-solid::before,.fa-regular::before,.fa-brands::before{content:"";display:block;height:100%;background-color:currentColor;-webkit-mask:var(--fa-icon) center/contain no-repeat;mask:var(--fa-icon) center/contain no-repeat}
+.fa-xs{font-size:.75em}.fa-sm{font-size:.875em}.fa-lg{font-size:1.25em}.fa-xl{font-size:1.5em}
+.fa-1x{font-size:1em}.fa-2x{font-size:2em}.fa-3x{font-size:3em}.fa-4x{font-size:4em}.fa-5x{font-size:5em}
+"""
+# After the icon rules so it wins over their widths
+FIXED_WIDTH_CSS = '.fa-fw{width:1.25em;text-align:center}\n'
+
+
+def project_root():
+    return Path(settings.BASE_DIR)
+
+
+def icons_css_path():
+    return Path(settings.STATICFILES_DIRS[0]) / ICONS_CSS
+
+
+def is_built():
+    return icons_css_path().exists()
+
+
+def scan_classes(text):
+    """``{(style, name)}`` of the static icon classes in ``text``"""
+    found = set()
+    for _, value in _CLASS_ATTR_RE.findall(text):
+        classes = value.split()
+        style = next((STYLES[c] for c in classes if c in STYLES), 'solid')
+        for c in classes:
+            # fa-{{ game.icon }} splits into 'fa-{{', 'game.icon', '}}'
+            if c.startswith('fa-') and c not in STYLES and '{' not in c and c[3:] not in MODIFIERS:
+                found.add((style, c[3:]))
+    return found
+
+
+def used_icons(game_icons=()):
+    """Icons the templates, scripts and ``game_icons`` (Game.icon values) need"""
+    root = project_root()
+    found = set()
+    for directory in SCANNED_DIRS:
+        for path in (root / directory).rglob('*'):
+            if path.suffix in SCANNED_SUFFIXES and path.is_file():
+                found |= scan_classes(path.read_text(encoding='utf-8', errors='replace'))
+    found |= {('solid', name.strip()) for name in game_icons if name and name.strip()}
+    return found
+
+
+def load_aliases(source):
+    """``{old name: current name}`` from Font Awesome's metadata/icons.json"""
+    path = Path(source) / 'metadata' / 'icons.json'
+    if not path.exists():
+        return {}
+    aliases = {}
+    for name, meta in json.loads(path.read_text(encoding='utf-8')).items():
+        for alias in (meta.get('aliases') or {}).get('names', []):
+            aliases[alias] = name
+    return aliases
+
+
+def find_svg(source, style, name, aliases):
+    """Path of the SVG for an icon; game icons may also be brand icons"""
+    svgs = Path(source) / 'svgs'
+    name = aliases.get(name, name)
+    for candidate in (style, 'brands') if style == 'solid' else (style,):
+        path = svgs / candidate / f'{name}.svg'
+        if path.exists():
+            return path
+    return None
+
+
+def svg_data_uri(svg):
+    svg = _SVG_COMMENT_RE.sub('', svg).strip().replace('"', "'")
+    return 'data:image/svg+xml,' + quote(svg, safe=" '=:/.,-")
+
+
+def icon_rule(style, name, svg):
+    match = _VIEWBOX_RE.search(svg)
+    width = int(match[1]) / int(match[2]) if match else 1
+    if style == 'solid':
+        selector = f'.fa-{name}'
+    else:
+        short = next(c for c, s in STYLES.items() if s == style and not c.startswith('fa-'))
+        selector = f'.{short}.fa-{name},.fa-{style}.fa-{name}'
+    return f'{selector}{{--fa-icon:url("{svg_data_uri(svg)}");width:{width:.4g}em}}'
+
+
+def build(source, game_icons=()):
+    """
+    Write static/css/icons.css for the icons in use.
+    Returns ``(written icons, missing (style, name) pairs)``.
+    """
+    source = Path(source)
+    aliases = load_aliases(source)
+    license_text = ''
+    rules, missing = [], []
+    for style, name in sorted(used_icons(game_icons)):
+        path = find_svg(source, style, name, aliases)
+        if path is None:
+            missing.append((style, name))
+            continue
+        svg = path.read_text(encoding='utf-8')
+        if not license_text:
+            comment = _SVG_COMMENT_RE.search(svg)
+            license_text = comment.group()[4:-3].strip(' !') if comment else ''
+        rules.append(icon_rule(style, name, svg))
+
+    css_path = icons_css_path()
+    css_path.parent.mkdir(parents=True, exist_ok=True)
+    # '/*!' keeps the licence through core.assets.minify_css
+    header = f'/*! {license_text} */\n' if license_text else ''
+    css_path.write_text(header + BASE_CSS + '\n'.join(rules) + '\n' + FIXED_WIDTH_CSS, encoding='utf-8')
+    return len(rules), missing
+
+
+def available_icons():
+    """Icon names in the built icons.css (empty when it isn't built)"""
+    if not is_built():
+        return set()
+    return set(re.findall(r'\.fa-([a-z0-9-]+)\{--fa-icon', icons_css_path().read_text(encoding='utf-8')))
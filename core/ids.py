@@ -0,0 +1,157 @@
+"""
+Public ID allocation
+Short public identifiers (order IDs, matchroom IDs, user IDs, referral
+codes) without "does this exist?" probes. Each kind of ID draws numbers
+from its own database sequence, a block at a time, and maps every number
+through a keyed permutation of the ID space. The permutation is a bijection,
+so distinct numbers give distinct IDs, and because it is keyed (derived from
+SECRET_KEY) consecutive numbers give unrelated-looking codes.
+
+Blocks are reserved with one UPDATE on IdSequence, so workers in different
+processes never share a number. A process hands out the rest of its block
+from memory; numbers left in a block when a worker exits are simply skipped.
+Blocks are only cached when reserved outside a transaction, so allocate IDs
+before transaction.atomic() where possible.
+"""
+import hashlib
+import hmac
+import os
+import threading
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import F
+
+
+ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+DEFAULT_BLOCK_SIZE = 100
+
+FEISTEL_ROUNDS = 6
+
+
+class IdSequence(models.Model):
+    """Next unreserved number for one kind of ID"""
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.BigIntegerField(default=0)
+
+    class Meta:
+        app_label = 'core'
+
+    def __str__(self):
+        return f'{self.name} @ {self.next_value}'
+
+
+def reserve_block(name, size):
+    """Reserve ``size`` numbers of sequence ``name``; returns the first"""
+    with transaction.atomic():
+        IdSequence.objects.get_or_create(name=name)
+        IdSequence.objects.filter(name=name).update(next_value=F('next_value') + size)
+        end = IdSequence.objects.values_list('next_value', flat=True).get(name=name)
+    return end - size
+
+
+class KeyedPermutation:
+    """
+    Bijection on ``range(domain)``: a balanced Feistel network over the
+    smallest even number of bits covering the domain, cycle-walked until
+    the output falls back inside it.
+    """
+
+    def __init__(self, key, domain):
+        self.key = key
+        self.domain = domain
+        bits = max(2, (domain - 1).bit_length())
+        self.half_bits = (bits + 1) // 2
+        self.half_mask = (1 << self.half_bits) - 1
+
+    def _round(self, i, value):
+        digest = hmac.new(self.key, f'{i}:{value}'.encode(), hashlib.sha256).digest()
+        return int.from_bytes(digest[:8], 'big') & self.half_mask
+
+    def _feistel(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for i in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ self._round(i, right)
+        return (left << self.half_bits) | right
+
+    def __call__(self, value):
+        if not 0 <= value < self.domain:
+            raise ValueError(f'{value} is outside the permutation domain')
+        value = self._feistel(value)
+        while value >= self.domain:
+            value = self._feistel(value)
+        return value
+
+
+def encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+class IdAllocator:
+    """
+    Hands out ``prefix`` + ``length`` characters of ALPHABET, unique for
+    the first len(ALPHABET) ** length numbers of sequence ``name``.
+    """
+
+    def __init__(self, name, length, prefix='', block_size=DEFAULT_BLOCK_SIZE):
+        self.name = name
+        self.length = length
+        self.prefix = prefix
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = self._end = 0
+        self._permutation = None
+
+    @property
+    def permutation(self):
+        if self._permutation is None:
+            key = hmac.new(settings.SECRET_KEY.encode(), f'ids:{self.name}'.encode(), hashlib.sha256).digest()
+            self._permutation = KeyedPermutation(key, len(ALPHABET) ** self.length)
+        return self._permutation
+
+    def next_number(self):
+        with self._lock:
+            # A forked worker must not reuse the block it inherited
+            if self._pid != os.getpid() or self._next >= self._end:
+                if connection.in_atomic_block:
+                    # A block reserved here is handed back if the caller's
+                    # transaction rolls back, so don't keep one around
+                    return reserve_block(self.name, 1)
+                self._next = reserve_block(self.name, self.block_size)
+                self._end = self._next + self.block_size
+                self._pid = os.getpid()
+            number = self._next
+            self._next += 1
+        return number
+
+    def __call__(self):
+        return self.prefix + encode(self.permutation(self.next_number()), self.length)
+
+
+ORDER_IDS = IdAllocator('order', 10, prefix='ORD')
+MATCHROOM_IDS = IdAllocator('matchroom', 8, prefix='MR')
+USER_IDS = IdAllocator('user', 8)
+REFERRAL_CODES = IdAllocator('referral', 8)
+
+
+def new_order_id():
+    return ORDER_IDS()
+
+
+def new_matchroom_id():
+    return MATCHROOM_IDS()
+
+
+def assign_user_ids(user):
+    """Fill a new user's blank user_id and referral_code"""
+    if not user.user_id:
+        user.user_id = USER_IDS()
+    if not user.referral_code:
+        user.referral_code = REFERRAL_CODES()
+    return user
@@ -0,0 +1,167 @@
+"""
+Image derivatives
+Resized copies of uploaded images (screenshots, avatars, QR codes, item
+art) for pages that display them small. A derivative is rendered with
+Pillow the first time it is asked for and written to
+``media/derivatives/<stored name of the original>-<spec>.<ext>``. Stored
+names are content addressed and never rewritten (core.storage,
+core.uploads), so re-uploads of the same file share derivatives and a
+replaced file never serves a stale one, and core.media can tell from a
+derivative's name which file, and so which rows, it was made from. The
+original -> derivative URL mapping is cached, so a warm page costs no disk
+or Pillow work.
+"""
+import logging
+import os
+import re
+import tempfile
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_DIR = 'derivatives'
+
+DERIVATIVE_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# name: (width, height, crop); cropped sizes fill the box, others fit inside it
+SIZES = {
+    'xs': (64, 64, True),
+    'sm': (128, 128, True),
+    'md': (480, 480, False),
+    'lg': (1280, 1280, False),
+    # Home page hero slides, 16:9 like the slider frame
+    'slide-640': (640, 360, True),
+    'slide-1280': (1280, 720, True),
+    'slide-1920': (1920, 1080, True),
+}
+
+SLIDE_SIZES = ('slide-640', 'slide-1280', 'slide-1920')
+
+# Twice the pixels of each cropped size, for srcset on high-density screens
+RETINA_SIZES = {'xs': 'sm'}
+
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def derivative_name(source_name, size, fmt):
+    return f'{DERIVATIVE_DIR}/{source_name}-{size}.{fmt}'
+
+
+# Longest match first: a spec may itself contain '-' (slide-640)
+_DERIVATIVE_RE = re.compile(r'^{}/(?P<source>.+)-(?:{})\.(?:{})$'.format(
+    DERIVATIVE_DIR,
+    '|'.join(re.escape(size) for size in sorted(SIZES, key=len, reverse=True)),
+    '|'.join(FORMATS),
+))
+
+
+def derivative_source(name):
+    """Stored name of the original that derivative ``name`` was rendered from, or None"""
+    match = _DERIVATIVE_RE.match(name)
+    return match['source'] if match else None
+
+
+def render(source, size, fmt):
+    """Encode ``size`` of the image in file object ``source`` as ``fmt``"""
+    width, height, crop = SIZES[size]
+    pil_format, _, options = FORMATS[fmt]
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if crop:
+            image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        else:
+            image.thumbnail((width, height), Image.LANCZOS)
+        if pil_format == 'JPEG':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        buffer = BytesIO()
+        image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def dhash(image):
+    """64-bit difference hash: brighter-than-right-neighbour bits of a 9x8 grayscale thumbnail"""
+    small = ImageOps.grayscale(image).resize((9, 8), Image.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def derivative_url(field_file, size='sm', fmt='webp'):
+    """
+    URL of the ``size``/``fmt`` derivative of ``field_file``, rendering it
+    on first use. Falls back to the original when it can't be decoded.
+    """
+    if not field_file:
+        return ''
+    key = f'derivative_url:{field_file.name}:{size}:{fmt}'
+    url = cache.get(key)
+    if url is not None:
+        return url
+
+    storage = field_file.storage
+    try:
+        name = derivative_name(field_file.name, size, fmt)
+        if not storage.exists(name):
+            with storage.open(field_file.name, 'rb') as source:
+                saved = write_derivative(storage, name, render(source, size, fmt))
+            if saved != name:
+                # Renamed by a remote storage: usable, but not under the name core.media expects
+                return storage.url(saved)
+        url = storage.url(name)
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.warning('Could not render %s derivative of %s: %s', size, field_file.name, e)
+        return field_file.url
+
+    cache.set(key, url, DERIVATIVE_CACHE_TIMEOUT)
+    return url
+
+
+def write_derivative(storage, name, data):
+    """
+    Store ``data`` as exactly ``name``. Concurrent first renders each write
+    a temporary file and rename it over ``name`` (same bytes), instead of
+    Storage.save() picking a free ``..._AbC123`` name for the loser.
+    Returns the stored name.
+    """
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        return storage.save(name, ContentFile(data))
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, storage.file_permissions_mode or 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return name
+
+
+def width_srcset(field_file, sizes, fmt='webp'):
+    """``srcset`` value listing each size's derivative with its pixel width"""
+    return ', '.join(f'{derivative_url(field_file, size, fmt)} {SIZES[size][0]}w' for size in sizes)
+
+
+def generate_derivatives(field_file, sizes=('xs', 'sm'), formats=tuple(FORMATS)):
+    """Render derivatives ahead of time, e.g. right after an upload"""
+    for size in sizes:
+        for fmt in formats:
+            derivative_url(field_file, size, fmt)
@@ -0,0 +1,43 @@
+"""
+Leaderboard
+Top players by tournaments won, then coins. Coins change on almost every
+request, so rather than invalidating on each User save the ranking is
+cached for LEADERBOARD_TIMEOUT seconds (core.caching namespace
+'leaderboard') and shared by the leaderboard page and the home page.
+leaderboard_page() also caches the rendered page (core.page_cache) for
+as long.
+"""
+from django.shortcuts import render
+
+from .caching import get_or_compute
+from .models import User
+from .page_cache import cached_page
+
+
+LEADERBOARD_NAMESPACE = 'leaderboard'
+LEADERBOARD_SIZE = 50
+LEADERBOARD_TIMEOUT = 60  # seconds
+
+
+def build_leaderboard(limit=LEADERBOARD_SIZE):
+    return list(
+        User.objects.filter(is_active=True)
+        .order_by('-total_tournaments_won', '-coins', 'pk')
+        .only('pk', 'username', 'user_id', 'avatar', 'coins', 'total_tournaments_won', 'total_tournaments_played')
+        [:limit]
+    )
+
+
+def top_players(limit=LEADERBOARD_SIZE):
+    players = get_or_compute(LEADERBOARD_NAMESPACE, 'top', build_leaderboard, LEADERBOARD_TIMEOUT)
+    return players[:limit]
+
+
+def leaderboard_context():
+    """Template context for core/leaderboard.html"""
+    return {'top_players': top_players()}
+
+
+@cached_page((LEADERBOARD_NAMESPACE,), LEADERBOARD_TIMEOUT)
+def leaderboard_page(request):
+    return render(request, 'core/leaderboard.html', leaderboard_context())
@@ -0,0 +1,103 @@
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from core.models import Order, StoreItem, Transaction, User
+from core.purchases import ItemStock, PurchaseResult, purchase_item, set_stock
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer a throwaway limited-stock item with concurrent purchases and '
+        'check that stock and balances never go negative. Creates and then '
+        'deletes its own users, item, orders and transactions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stock', type=int, default=100, help='Units on sale')
+        parser.add_argument('--buyers', type=int, default=50, help='Distinct players')
+        parser.add_argument('--requests', type=int, default=500, help='Total purchase attempts')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent workers')
+        parser.add_argument('--price', type=int, default=10)
+        parser.add_argument('--coins', type=int, default=50, help='Starting balance per buyer')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        price, coins = options['price'], options['coins']
+
+        item = StoreItem.objects.create(
+            name=f'Benchmark {tag}', description='benchmark', quantity=1, price=price, is_active=True,
+        )
+        set_stock(item, options['stock'])
+        buyers = [
+            User.objects.create_user(username=f'bench_{tag}_{i}', password=None, coins=coins)
+            for i in range(options['buyers'])
+        ]
+
+        outcomes = Counter()
+        lock = threading.Lock()
+        attempts = iter(range(options['requests']))
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        n = next(attempts, None)
+                    if n is None:
+                        return
+                    buyer = buyers[n % len(buyers)]
+                    try:
+                        code = purchase_item(buyer, item, in_game_id=str(n)).code
+                    except DatabaseError as e:
+                        code = f'error: {e}'
+                    with lock:
+                        outcomes[code] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            self._report(item, buyers, outcomes, elapsed, options)
+        finally:
+            Transaction.objects.filter(user__in=buyers).delete()
+            Order.objects.filter(item=item).delete()
+            User.objects.filter(pk__in=[buyer.pk for buyer in buyers]).delete()
+            item.delete()
+
+    def _report(self, item, buyers, outcomes, elapsed, options):
+        total = sum(outcomes.values())
+        self.stdout.write(f'{total} purchases in {elapsed:.2f}s ({total / elapsed:.0f}/s)')
+        for code, count in sorted(outcomes.items()):
+            self.stdout.write(f'  {code}: {count}')
+
+        sold = Order.objects.filter(item=item).count()
+        remaining = ItemStock.objects.get(pk=item.pk).remaining
+        balances = list(User.objects.filter(pk__in=[b.pk for b in buyers]).values_list('coins', flat=True))
+        spent = len(buyers) * options['coins'] - sum(balances)
+
+        problems = []
+        if sold != outcomes[PurchaseResult.OK]:
+            problems.append(f'{sold} orders for {outcomes[PurchaseResult.OK]} successful purchases')
+        if sold + remaining != options['stock']:
+            problems.append(f'sold {sold} + remaining {remaining} != stock {options["stock"]}')
+        if min(balances) < 0:
+            problems.append(f'negative balance {min(balances)}')
+        if spent != sold * item.price:
+            problems.append(f'{spent} coins charged for {sold} orders')
+        if problems:
+            raise CommandError('Inconsistent result: ' + '; '.join(problems))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'OK: sold {sold}, {remaining} left, no oversell, no negative balances'
+        ))
@@ -0,0 +1,130 @@
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from core.dbcopy import register_database
+
+
+# label: (ENGINE, OPTIONS)
+MODES = {
+    'django default': ('django.db.backends.sqlite3', {}),
+    'tuned': ('core.sqlite', {'transaction_mode': 'IMMEDIATE'}),
+    'tuned + write queue': ('core.sqlite', {'transaction_mode': 'IMMEDIATE', 'write_queue': True}),
+}
+
+STARTING_COINS = 1000
+
+SCHEMA = (
+    'CREATE TABLE bench_wallet (id INTEGER PRIMARY KEY, coins INTEGER NOT NULL)',
+    'CREATE TABLE bench_ledger (id INTEGER PRIMARY KEY, wallet_id INTEGER NOT NULL, amount INTEGER NOT NULL)',
+    'CREATE INDEX bench_ledger_wallet ON bench_ledger (wallet_id)',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare SQLite connection modes under concurrent wallet-style writes '
+        '(read a balance, update it, append a ledger row) mixed with reads. '
+        'Each mode runs against its own throwaway database file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent threads')
+        parser.add_argument('--writes', type=int, default=200, help='Write transactions per worker')
+        parser.add_argument('--reads', type=int, default=4, help='Reads before each write')
+        parser.add_argument('--wallets', type=int, default=50)
+        parser.add_argument('--mode', action='append', choices=list(MODES), help='Run only these modes')
+
+    def handle(self, *args, **options):
+        inconsistent = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for n, label in enumerate(options['mode'] or MODES):
+                alias = f'benchmark_{n}'
+                engine, db_options = MODES[label]
+                self._add_database(alias, engine, Path(tmp) / f'{alias}.sqlite3', db_options, options['wallets'])
+                try:
+                    outcomes, latencies, elapsed, consistent = self._run(alias, options)
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+                self._report(label, outcomes, latencies, elapsed)
+                if not consistent:
+                    inconsistent.append(label)
+        if inconsistent:
+            raise CommandError(f'Ledger and balances disagree for: {", ".join(inconsistent)}')
+
+    def _add_database(self, alias, engine, path, db_options, wallets):
+        register_database(alias, {'ENGINE': engine, 'NAME': str(path), 'OPTIONS': dict(db_options)})
+        with connections[alias].cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany(
+                'INSERT INTO bench_wallet (id, coins) VALUES (%s, %s)',
+                [(wallet, STARTING_COINS) for wallet in range(wallets)],
+            )
+
+    def _run(self, alias, options):
+        outcomes = Counter()
+        latencies = []
+        lock = threading.Lock()
+        wallets = options['wallets']
+
+        def worker(n):
+            try:
+                for i in range(options['writes']):
+                    wallet = (n * options['writes'] + i) % wallets
+                    for _ in range(options['reads']):
+                        with connections[alias].cursor() as cursor:
+                            cursor.execute(
+                                'SELECT COUNT(*), SUM(amount) FROM bench_ledger WHERE wallet_id = %s', [wallet]
+                            )
+                    started = time.perf_counter()
+                    try:
+                        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+                            cursor.execute('SELECT coins FROM bench_wallet WHERE id = %s', [wallet])
+                            coins = cursor.fetchone()[0]
+                            cursor.execute('UPDATE bench_wallet SET coins = %s WHERE id = %s', [coins - 1, wallet])
+                            cursor.execute('INSERT INTO bench_ledger (wallet_id, amount) VALUES (%s, -1)', [wallet])
+                        outcome = 'committed'
+                    except OperationalError as e:
+                        outcome = f'error: {e}'
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        outcomes[outcome] += 1
+                        latencies.append(elapsed)
+            finally:
+                connections[alias].close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(options['workers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM bench_ledger')
+            rows = cursor.fetchone()[0]
+            cursor.execute('SELECT SUM(coins) FROM bench_wallet')
+            spent = wallets * STARTING_COINS - cursor.fetchone()[0]
+        return outcomes, latencies, elapsed, rows == spent == outcomes['committed']
+
+    def _report(self, label, outcomes, latencies, elapsed):
+        committed = outcomes['committed']
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(
+            f'  {committed} writes committed in {elapsed:.2f}s ({committed / elapsed:.0f}/s), '
+            f'median {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms'
+        )
+        for outcome, count in sorted(outcomes.items()):
+            if outcome != 'committed':
+                self.stdout.write(self.style.WARNING(f'  {outcome}: {count}'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core import assets
+
+
+class Command(BaseCommand):
+    help = 'Bundle, minify, fingerprint and precompress the static CSS/JS into static/dist'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-old', action='store_true',
+            help='Leave earlier builds in place (e.g. while old pages are still cached)',
+        )
+
+    def handle(self, *args, **options):
+        report = assets.build()
+        for name, built in report.items():
+            if built is None:
+                self.stdout.write(self.style.WARNING(f'{name}: skipped, source files missing'))
+                continue
+            target, source_size, size, suffixes = built
+            compressed = ' + '.join(suffixes) or 'not compressed'
+            self.stdout.write(f'{name} -> {target}: {source_size} -> {size} bytes ({compressed})')
+
+        if not options['keep_old']:
+            removed = assets.prune({built[0] for built in report.values() if built})
+            self.stdout.write(f'Removed {removed} stale files')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {assets.output_dir() / assets.MANIFEST_NAME}'))
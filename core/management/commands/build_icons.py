@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import icons
+from core.models import Game
+
+
+class Command(BaseCommand):
+    help = 'Generate static/css/icons.css with only the Font Awesome icons the site uses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', required=True,
+            help='Unpacked Font Awesome Free package (the directory holding svgs/ and metadata/)',
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        if not (source / 'svgs').is_dir():
+            raise CommandError(f'{source} has no svgs/ directory; pass the root of fontawesome-free')
+
+        game_icons = Game.objects.values_list('icon', flat=True)
+        written, missing = icons.build(source, game_icons)
+        for style, name in missing:
+            self.stdout.write(self.style.WARNING(f'Not found: {style} fa-{name}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} icons to {icons.icons_css_path()}; run build_assets to fingerprint it'
+        ))
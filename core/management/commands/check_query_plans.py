@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.query_plans import HOT_QUERIES, check
+
+
+class Command(BaseCommand):
+    help = 'Explain each hot admin/player query and fail if one needs a full scan or a sort'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+
+    def handle(self, *args, **options):
+        failed = []
+        for name in HOT_QUERIES:
+            plan, problems = check(name)
+            if problems:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(f'FAIL  {name}: {", ".join(problems)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'ok    {name}'))
+            if problems or options['verbose_plans']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'        {line}')
+        if failed:
+            raise CommandError(f'{len(failed)} of {len(HOT_QUERIES)} hot queries degraded: {", ".join(failed)}')
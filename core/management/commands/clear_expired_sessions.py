@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.sessions import SESSION_DELETE_BATCH, clear_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in batches (run it from cron; cached_db keeps them in the database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SESSION_DELETE_BATCH,
+                            help='Sessions deleted per statement')
+
+    def handle(self, *args, **options):
+        deleted = clear_expired_sessions(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired sessions'))
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+
+from core.dbcopy import (
+    BATCH_SIZE, Progress, TableCopy, copied_models, rebuild_search, register_database, reset_sequences,
+    truncate,
+)
+
+
+SOURCE_ALIAS = 'sqlite_source'
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the SQLite database into PostgreSQL in resumable batches and '
+        'verify it (see core.dbcopy). Run with DB_BACKEND=postgresql after '
+        '"manage.py migrate"; run again with the site stopped to catch up.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(settings.BASE_DIR / 'db.sqlite3'), help='SQLite file')
+        parser.add_argument('--target', default='default', help='PostgreSQL database alias')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--restart', action='store_true', help='Forget earlier progress and copy everything')
+        parser.add_argument('--verify-only', action='store_true', help='Only compare row counts and checksums')
+
+    def handle(self, *args, **options):
+        target = options['target']
+        if connections[target].vendor != 'postgresql':
+            raise CommandError(f'{target!r} is {connections[target].vendor}, not PostgreSQL; set DB_BACKEND=postgresql')
+        if not Path(options['source']).is_file():
+            raise CommandError(f'No SQLite database at {options["source"]}')
+        register_database(SOURCE_ALIAS, {'ENGINE': 'core.sqlite', 'NAME': options['source']})
+        self.check_migrations(target)
+
+        models = copied_models()
+        copies = [TableCopy(model, SOURCE_ALIAS, target, options['batch_size']) for model in models]
+        if options['verify_only']:
+            self.verify(copies)
+            return
+
+        progress = Progress(target)
+        if options['restart']:
+            progress.drop()
+        progress.create()
+        if not progress.is_started():
+            truncate(target, models)
+        progress.start(models)
+
+        for table in copies:
+            copied = table.copy(progress)
+            self.stdout.write(f'{table.table}: {copied} rows copied')
+
+        # Dependents first, so rows deleted from the source leave no dangling references
+        for table in reversed(copies):
+            rows, recopied = table.sync()
+            self.stdout.write(f'{table.table}: {rows} rows in sync, {recopied} recopied')
+
+        reset_sequences(target, models)
+        rebuild_search(target)
+        self.verify(copies)
+
+    def check_migrations(self, target):
+        source_applied = MigrationRecorder(connections[SOURCE_ALIAS]).applied_migrations()
+        target_applied = MigrationRecorder(connections[target]).applied_migrations()
+        missing = sorted(f'{app}.{name}' for app, name in set(source_applied) - set(target_applied))
+        if missing:
+            raise CommandError(f'Run "manage.py migrate" on the target first; missing {", ".join(missing)}')
+
+    def verify(self, copies):
+        failed = []
+        for table in copies:
+            (source_rows, source_sum), (target_rows, target_sum) = table.verify()
+            if (source_rows, source_sum) != (target_rows, target_sum):
+                detail = f'{source_rows} rows' if source_rows == target_rows else f'{source_rows} vs {target_rows} rows'
+                failed.append(f'{table.table} ({detail})')
+        if failed:
+            raise CommandError(f'Source and target differ: {", ".join(failed)}')
+        self.stdout.write(self.style.SUCCESS(f'Verified {len(copies)} tables: row counts and checksums match'))
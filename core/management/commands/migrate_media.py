@@ -0,0 +1,108 @@
+import os
+import re
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import FileField
+
+from core.storage import ContentAddressedStorage, is_sharded
+
+
+# Files younger than this may belong to an upload whose row isn't saved yet
+PRUNE_GRACE_SECONDS = 60 * 60
+
+SHARD_DIR_RE = re.compile(r'^[0-9a-f]{2}$')
+
+
+def file_fields():
+    """(model, field) for every FileField/ImageField on content-addressed storage"""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage):
+                yield model, field
+
+
+class Command(BaseCommand):
+    help = 'Move existing uploads into the sharded, content-addressed media layout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the files that would move')
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Afterwards, delete content-addressed files that no row refers to',
+        )
+
+    def handle(self, *args, **options):
+        fields = list(file_fields())
+        if not fields:
+            raise CommandError('No file fields use core.storage.ContentAddressedStorage; check STORAGES["default"]')
+
+        for model, field in fields:
+            moved, missing = self.migrate_field(model, field, options['batch_size'], options['dry_run'])
+            self.stdout.write(f'{model._meta.label}.{field.name}: {moved} moved, {missing} missing')
+
+        if options['prune'] and not options['dry_run']:
+            pruned = self.prune(fields)
+            self.stdout.write(f'Pruned {pruned} unreferenced files')
+
+        self.stdout.write(self.style.SUCCESS('Done'))
+
+    def migrate_field(self, model, field, batch_size, dry_run):
+        storage, manager = field.storage, model._default_manager
+        rows = manager.exclude(**{field.name: ''}).values_list('pk', field.name).order_by('pk')
+        moved = missing = 0
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            if not is_sharded(row[1]) and storage.is_addressed(row[1]):
+                batch.append(row)
+            if len(batch) >= batch_size:
+                moved, missing = self.move_batch(manager, field, batch, dry_run, moved, missing)
+                batch = []
+        if batch:
+            moved, missing = self.move_batch(manager, field, batch, dry_run, moved, missing)
+        return moved, missing
+
+    def move_batch(self, manager, field, batch, dry_run, moved, missing):
+        storage = field.storage
+        old_names = set()
+        for pk, name in batch:
+            if not storage.exists(name):
+                missing += 1
+                continue
+            moved += 1
+            if dry_run:
+                continue
+            with storage.open(name, 'rb') as f:
+                new_name = storage.save(name, f)
+            # Guarded: skip rows whose file changed since we read them
+            manager.filter(pk=pk, **{field.name: name}).update(**{field.name: new_name})
+            old_names.add(name)
+
+        # Drop the old copies no row points at any more
+        still_used = set(manager.filter(**{f'{field.name}__in': old_names}).values_list(field.name, flat=True))
+        for name in old_names - still_used:
+            storage.delete(name)
+        return moved, missing
+
+    def prune(self, fields):
+        referenced = set()
+        for model, field in fields:
+            rows = model._default_manager.exclude(**{field.name: ''}).values_list(field.name, flat=True)
+            referenced.update(rows.iterator(chunk_size=2000))
+
+        cutoff = time.time() - PRUNE_GRACE_SECONDS
+        pruned = 0
+        for storage in {field.storage.location: field.storage for _, field in fields}.values():
+            for entry in os.scandir(storage.location):
+                if not (entry.is_dir() and SHARD_DIR_RE.match(entry.name)):
+                    continue
+                for root, _, files in os.walk(entry.path):
+                    for filename in files:
+                        path = os.path.join(root, filename)
+                        name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                        if is_sharded(name) and name not in referenced and os.path.getmtime(path) < cutoff:
+                            storage.delete_unreferenced(name)
+                            pruned += 1
+        return pruned
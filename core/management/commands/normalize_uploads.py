@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.uploads import NORMALIZED_FIELDS, get_executor, normalize_existing
+
+
+class Command(BaseCommand):
+    help = 'Cap, re-orient, strip and recompress images uploaded before normalization existed'
+
+    def handle(self, *args, **options):
+        futures = []
+        for model_label, fields in NORMALIZED_FIELDS.items():
+            for field in fields:
+                queued = normalize_existing(model_label, field)
+                self.stdout.write(f'{model_label}.{field}: {len(queued)} files queued')
+                futures.extend(queued)
+
+        # Waits for the workers and for the row updates run on completion
+        get_executor().shutdown(wait=True)
+        failed = sum(1 for future in futures if future.exception() is not None)
+        self.stdout.write(self.style.SUCCESS(f'Normalized {len(futures) - failed} files, {failed} failed'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.search import SEARCH_INDEXES, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Repopulate full-text search tables from their source models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'indexes', nargs='*',
+            help=f'Index names to rebuild (default: all of {", ".join(SEARCH_INDEXES)})',
+        )
+
+    def handle(self, *args, **options):
+        names = options['indexes'] or list(SEARCH_INDEXES)
+        unknown = set(names) - set(SEARCH_INDEXES)
+        if unknown:
+            raise CommandError(f'Unknown search index: {", ".join(sorted(unknown))}')
+
+        for name in names:
+            rebuild_index(name)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt search index "{name}"'))
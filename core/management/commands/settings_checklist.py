@@ -0,0 +1,90 @@
+import logging
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.middleware.gzip import GZipMiddleware
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.utils.module_loading import import_string
+
+from core import assets, icons
+from core.middleware import CachedAuthenticationMiddleware
+
+
+def checks():
+    """(label, passed, detail) for each item of the deployment checklist"""
+    yield 'DEBUG is off', not settings.DEBUG, f'DEBUG = {settings.DEBUG}'
+
+    insecure = settings.SECRET_KEY.startswith('django-insecure') or len(settings.SECRET_KEY) < 50
+    yield 'SECRET_KEY is a real secret', not insecure, 'set DJANGO_SECRET_KEY' if insecure else 'ok'
+
+    yield 'ALLOWED_HOSTS is explicit', '*' not in settings.ALLOWED_HOSTS, ', '.join(settings.ALLOWED_HOSTS)
+
+    engine = engines['django'].engine
+    cached = any(isinstance(loader, CachedLoader) for loader in engine.template_loaders)
+    yield 'Cached template loader', cached, ', '.join(type(loader).__module__ for loader in engine.template_loaders)
+
+    for alias, database in settings.DATABASES.items():
+        max_age = database.get('CONN_MAX_AGE', 0)
+        yield f'Persistent connections ({alias})', max_age is None or max_age > 0, f'CONN_MAX_AGE = {max_age}'
+        if database['ENGINE'].endswith('sqlite3'):
+            yield f'SQLite in WAL mode ({alias})', False, 'ENGINE = core.sqlite'
+        elif database['ENGINE'] == 'core.sqlite':
+            mode = database.get('OPTIONS', {}).get('transaction_mode', 'DEFERRED')
+            yield f'SQLite write transactions ({alias})', mode.upper() != 'DEFERRED', f'transaction_mode = {mode}'
+
+    compression = [path for path in settings.MIDDLEWARE if issubclass(import_string(path), GZipMiddleware)]
+    yield 'Response compression', bool(compression), ', '.join(compression) or 'no GZipMiddleware'
+
+    static_storage = storages['staticfiles']
+    yield 'Hashed static files', isinstance(static_storage, ManifestFilesMixin), type(static_storage).__name__
+    if isinstance(static_storage, ManifestFilesMixin):
+        collected = static_storage.exists(static_storage.manifest_name)
+        yield 'collectstatic has run', collected, static_storage.path(static_storage.manifest_name)
+
+    yield 'Asset bundles built', bool(assets.load_manifest()), 'manage.py build_assets'
+    yield 'Icon subset built', icons.is_built(), 'manage.py build_icons --source <fontawesome-free>'
+
+    engine_name = settings.SESSION_ENGINE.rsplit('.', 1)[-1]
+    yield 'Sessions not read from the database', engine_name != 'db', settings.SESSION_ENGINE
+    cached_user = any(issubclass(import_string(path), CachedAuthenticationMiddleware) for path in settings.MIDDLEWARE)
+    yield 'Request user cached per session', cached_user, 'core.middleware.CachedAuthenticationMiddleware'
+    yield 'Secure session cookie', settings.SESSION_COOKIE_SECURE, f'SESSION_COOKIE_SECURE = {settings.SESSION_COOKIE_SECURE}'
+    yield 'Secure CSRF cookie', settings.CSRF_COOKIE_SECURE, f'CSRF_COOKIE_SECURE = {settings.CSRF_COOKIE_SECURE}'
+
+    backend = settings.CACHES['default']['BACKEND']
+    shared = not backend.endswith('LocMemCache')
+    yield 'Cache shared by all workers', shared, backend if shared else 'locmem: invalidations stay in one process'
+
+    query_logging = logging.getLogger('django.db.backends').getEffectiveLevel() <= logging.DEBUG
+    yield 'No per-query logging', not query_logging, logging.getLevelName(
+        logging.getLogger('django.db.backends').getEffectiveLevel()
+    )
+
+
+class Command(BaseCommand):
+    help = 'Check the active settings profile against the production checklist'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Fail on any unmet item even outside the prod profile',
+        )
+
+    def handle(self, *args, **options):
+        from gaming_platform.settings import PROFILE
+
+        self.stdout.write(f'Profile: {PROFILE}')
+        failed = 0
+        for label, passed, detail in checks():
+            if passed:
+                self.stdout.write(self.style.SUCCESS(f'  [ok]   {label}') + f'  ({detail})')
+            else:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  [fail] {label}') + f'  ({detail})')
+
+        if failed and (PROFILE == 'prod' or options['strict']):
+            raise CommandError(f'{failed} checklist items failed')
+        self.stdout.write(f'{failed} items not met' if failed else self.style.SUCCESS('All items met'))
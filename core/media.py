@@ -0,0 +1,166 @@
+"""
+Media serving
+Every MEDIA_URL request goes through serve_media(). Files referenced by a
+private field (payment screenshots, withdrawal QR codes, result
+screenshots) are only served to their owner and staff; their derivatives
+inherit that through the source's stored name in their own (core.images),
+and a derivative whose source can't be found is served to staff only. The
+transfer itself is handed to the front proxy when MEDIA_SERVE_BACKEND says
+there is one:
+
+    'nginx'     X-Accel-Redirect to MEDIA_ACCEL_PREFIX + path, e.g.
+                location /protected-media/ { internal; alias /srv/app/media/; }
+    'sendfile'  X-Sendfile with the absolute path (Apache mod_xsendfile,
+                lighttpd)
+    'django'    (default) FileResponse, which the WSGI server can send
+                with sendfile(); Range requests are answered with 206.
+
+Content-addressed and derivative names never change content, so they are
+cached for a year as immutable.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .images import DERIVATIVE_DIR, derivative_source
+from .storage import is_sharded
+
+
+# model label: (file field, owner id field)
+PRIVATE_FIELDS = {
+    'core.PaymentRequest': ('payment_screenshot', 'user_id'),
+    'core.WithdrawalRequest': ('payment_qr', 'user_id'),
+    'core.TournamentResult': ('screenshot', 'user_id'),
+}
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+DEFAULT_MAX_AGE = 60 * 60
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def owner_ids(name):
+    """
+    Owners of the private rows referring to media file ``name``; None when
+    no private row does (the file is public). A derivative goes by its
+    source file; when that can't be found nobody owns it (staff only).
+    """
+    if name.startswith(f'{DERIVATIVE_DIR}/'):
+        name = derivative_source(name)
+        if name is None or not default_storage.exists(name):
+            return set()
+
+    owners = None
+    for label, (field, owner_field) in PRIVATE_FIELDS.items():
+        rows = apps.get_model(label)._default_manager.filter(**{field: name})
+        found = set(rows.values_list(owner_field, flat=True))
+        if found:
+            owners = (owners or set()) | found
+    return owners
+
+
+def can_view(user, owners):
+    if owners is None:
+        return True
+    return user.is_authenticated and (user.is_staff or user.pk in owners)
+
+
+def _byte_range(header, size):
+    """(start, end) inclusive for a single ``bytes=`` range, or None"""
+    match = _RANGE_RE.match(header or '')
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(default_storage.location, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    owners = owner_ids(name)
+    if not can_view(request.user, owners):
+        # Don't reveal that the file exists
+        raise Http404
+
+    private = owners is not None
+    immutable = is_sharded(name) or derivative_source(name) is not None
+    etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _transfer(request, name, full_path, stat.st_size)
+    response.headers.setdefault('ETag', etag)
+    response.headers.setdefault('Last-Modified', http_date(last_modified))
+    patch_cache_control(
+        response,
+        private=private, public=not private,
+        max_age=IMMUTABLE_MAX_AGE if immutable else DEFAULT_MAX_AGE,
+        immutable=immutable,
+    )
+    return response
+
+
+def _transfer(request, name, full_path, size):
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    backend = getattr(settings, 'MEDIA_SERVE_BACKEND', 'django')
+
+    if backend == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/') + name
+        return response
+    if backend == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+
+    byte_range = _byte_range(request.headers.get('Range'), size)
+    if byte_range is not None:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(full_path, start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return response
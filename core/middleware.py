@@ -0,0 +1,36 @@
+"""
+Project middleware
+"""
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.http import FileResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from .sessions import cached_user
+
+
+# Already compressed, or not worth it
+UNCOMPRESSED_TYPES = ('image/', 'video/', 'audio/', 'font/woff', 'application/zip', 'application/gzip')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware minus files (media is served by core.media and may be
+    a 206 partial response, which must not be re-encoded) and content that
+    is already compressed.
+    """
+
+    def process_response(self, request, response):
+        if isinstance(response, FileResponse) or response.status_code == 206:
+            return response
+        if response.get('Content-Type', '').startswith(UNCOMPRESSED_TYPES):
+            return response
+        return super().process_response(request, response)
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware with request.user read through core.sessions"""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: cached_user(request))
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_alter_chatmessage_subject'),
+    ]
+
+    operations = [
+        # Keyset pagination of the withdrawal queue, filtered by status
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_withdrawal_status_created_idx '
+            'ON core_withdrawalrequest (status, created_at, id);',
+            'DROP INDEX IF EXISTS core_withdrawal_status_created_idx;',
+        ),
+        # Keyset pagination of the unfiltered ("all") queue
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_withdrawal_created_idx '
+            'ON core_withdrawalrequest (created_at, id);',
+            'DROP INDEX IF EXISTS core_withdrawal_created_idx;',
+        ),
+        # Prefix search on payment method
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_withdrawal_method_idx '
+            'ON core_withdrawalrequest (payment_method);',
+            'DROP INDEX IF EXISTS core_withdrawal_method_idx;',
+        ),
+        # Exact e-mail lookup from the admin search boxes
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_user_email_idx ON core_user (email);',
+            'DROP INDEX IF EXISTS core_user_email_idx;',
+        ),
+    ]
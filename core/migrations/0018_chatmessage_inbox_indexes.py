@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_withdrawalrequest_queue_indexes'),
+    ]
+
+    operations = [
+        # Keyset pagination of the support inbox, filtered by status
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_chat_status_created_idx '
+            'ON core_chatmessage (status, created_at, id);',
+            'DROP INDEX IF EXISTS core_chat_status_created_idx;',
+        ),
+        # Keyset pagination of the unfiltered ("all") inbox
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_chat_created_idx '
+            'ON core_chatmessage (created_at, id);',
+            'DROP INDEX IF EXISTS core_chat_created_idx;',
+        ),
+        # Prefix search on subject
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_chat_subject_idx '
+            'ON core_chatmessage (subject);',
+            'DROP INDEX IF EXISTS core_chat_subject_idx;',
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations
+
+
+# The search tables as they were when this migration was written, so that
+# later changes to core.search don't change what it creates.
+# table: (model, indexed columns)
+SEARCH_TABLES = {
+    'core_search_chat': ('ChatMessage', ['subject', 'message', 'admin_reply']),
+    'core_search_transaction': ('Transaction', ['description']),
+    'core_search_payment': ('PaymentRequest', ['transaction_id', 'payment_method', 'admin_notes']),
+    'core_search_order': ('Order', ['order_id', 'in_game_id', 'in_game_name', 'admin_notes']),
+    'core_search_user': ('User', ['username', 'email', 'user_id', 'phone', 'referral_code']),
+}
+
+
+def create_sqlite(cursor, table, columns, source_table):
+    columns = ', '.join(columns)
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+        f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+    )
+    cursor.execute(f'DELETE FROM {table}')
+    cursor.execute(f'INSERT INTO {table} (rowid, {columns}) SELECT id, {columns} FROM {source_table}')
+
+
+def create_postgresql(cursor, table, columns, source_table):
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {table} '
+        f'(object_id bigint PRIMARY KEY, document tsvector NOT NULL)'
+    )
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS {table}_document_idx ON {table} USING GIN (document)')
+    cursor.execute(f'TRUNCATE {table}')
+    cursor.execute(
+        f'INSERT INTO {table} (object_id, document) '
+        f"SELECT id, to_tsvector('simple', concat_ws(' ', {', '.join(columns)})) FROM {source_table}"
+    )
+
+
+CREATE = {
+    'sqlite': create_sqlite,
+    'postgresql': create_postgresql,
+}
+
+
+def create_search_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor not in CREATE:
+        raise ImproperlyConfigured(f'Full-text search is not supported on {connection.vendor}')
+    with connection.cursor() as cursor:
+        for table, (model_name, columns) in SEARCH_TABLES.items():
+            source_table = apps.get_model('core', model_name)._meta.db_table
+            CREATE[connection.vendor](cursor, table, columns, source_table)
+
+
+def drop_search_tables(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table in SEARCH_TABLES:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_chatmessage_inbox_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
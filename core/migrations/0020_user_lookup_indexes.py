@@ -0,0 +1,74 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations
+
+
+# Frozen here so later changes to core.search don't change this migration
+USER_SEARCH_TABLE = 'core_search_user'
+USER_SEARCH_COLUMNS = 'username, email, user_id, phone, referral_code'
+
+
+def create_sqlite(cursor, source_table):
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {USER_SEARCH_TABLE} "
+        f"USING fts5({USER_SEARCH_COLUMNS}, tokenize='trigram')"
+    )
+    cursor.execute(
+        f'INSERT INTO {USER_SEARCH_TABLE} (rowid, {USER_SEARCH_COLUMNS}) '
+        f'SELECT id, {USER_SEARCH_COLUMNS} FROM {source_table}'
+    )
+
+
+def create_postgresql(cursor, source_table):
+    cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    cursor.execute(f'CREATE TABLE {USER_SEARCH_TABLE} (object_id bigint PRIMARY KEY, document text NOT NULL)')
+    cursor.execute(
+        f'CREATE INDEX {USER_SEARCH_TABLE}_document_idx '
+        f'ON {USER_SEARCH_TABLE} USING GIN (document gin_trgm_ops)'
+    )
+    cursor.execute(
+        f'INSERT INTO {USER_SEARCH_TABLE} (object_id, document) '
+        f"SELECT id, lower(concat_ws(' ', {USER_SEARCH_COLUMNS})) FROM {source_table}"
+    )
+
+
+CREATE = {
+    'sqlite': create_sqlite,
+    'postgresql': create_postgresql,
+}
+
+
+def rebuild_user_search(apps, schema_editor):
+    # The user index switched to trigram (substring) matching
+    connection = schema_editor.connection
+    if connection.vendor not in CREATE:
+        raise ImproperlyConfigured(f'Full-text search is not supported on {connection.vendor}')
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {USER_SEARCH_TABLE}')
+        CREATE[connection.vendor](cursor, apps.get_model('core', 'User')._meta.db_table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_user_search, migrations.RunPython.noop),
+        # Exact phone lookup from the staff user search
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_user_phone_idx ON core_user (phone);',
+            'DROP INDEX IF EXISTS core_user_phone_idx;',
+        ),
+        # Keyset pagination of the user list
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_user_joined_idx ON core_user (date_joined, id);',
+            'DROP INDEX IF EXISTS core_user_joined_idx;',
+        ),
+        # Pending-payment counts per user
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_payment_user_status_idx '
+            'ON core_paymentrequest (user_id, status);',
+            'DROP INDEX IF EXISTS core_payment_user_status_idx;',
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import slugify
+
+
+def split_product_types(apps, schema_editor):
+    """Create ProductType rows from each game's comma-separated string"""
+    Game = apps.get_model('core', 'Game')
+    StoreItem = apps.get_model('core', 'StoreItem')
+    ProductType = apps.get_model('core', 'ProductType')
+    Through = ProductType.items.through
+
+    new_types = []
+    for game in Game.objects.only('id', 'product_types'):
+        seen = set()
+        for order, name in enumerate(n.strip() for n in (game.product_types or '').split(',')):
+            slug = slugify(name)
+            if name and slug not in seen:
+                seen.add(slug)
+                new_types.append(ProductType(game_id=game.id, name=name, slug=slug, display_order=order))
+    ProductType.objects.bulk_create(new_types)
+
+    # Tag existing items whose name mentions one of their game's types,
+    # e.g. "100 Free Fire Diamonds" -> DIAMONDS.
+    types_by_game = {}
+    for product_type in ProductType.objects.all():
+        types_by_game.setdefault(product_type.game_id, []).append(product_type)
+
+    links = []
+    for item in StoreItem.objects.filter(game__isnull=False).only('id', 'name', 'game_id').iterator():
+        name = item.name.lower()
+        for product_type in types_by_game.get(item.game_id, []):
+            if product_type.name.lower() in name:
+                links.append(Through(producttype_id=product_type.id, storeitem_id=item.id))
+    Through.objects.bulk_create(links, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_user_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100)),
+                ('display_order', models.IntegerField(default=0)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='types', to='core.game')),
+                ('items', models.ManyToManyField(blank=True, related_name='product_types', to='core.storeitem')),
+            ],
+            options={
+                'ordering': ['display_order', 'name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='producttype',
+            constraint=models.UniqueConstraint(fields=('game', 'slug'), name='core_producttype_game_slug_uniq'),
+        ),
+        # Store pages filter items by (game, is_active) before the type join
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_storeitem_game_active_idx '
+            'ON core_storeitem (game_id, is_active);',
+            'DROP INDEX IF EXISTS core_storeitem_game_active_idx;',
+        ),
+        migrations.RunPython(split_product_types, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_fulfilmentbatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemStock',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock', serialize=False, to='core.storeitem')),
+                ('remaining', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
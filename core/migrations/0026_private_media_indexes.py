@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_screenshothash'),
+    ]
+
+    # core.media looks up the owner of every private file it serves
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_paymentrequest_screenshot_idx '
+            'ON core_paymentrequest (payment_screenshot);',
+            'DROP INDEX IF EXISTS core_paymentrequest_screenshot_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_withdrawalrequest_payment_qr_idx '
+            'ON core_withdrawalrequest (payment_qr);',
+            'DROP INDEX IF EXISTS core_withdrawalrequest_payment_qr_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_tournamentresult_screenshot_idx '
+            'ON core_tournamentresult (screenshot);',
+            'DROP INDEX IF EXISTS core_tournamentresult_screenshot_idx;',
+        ),
+    ]
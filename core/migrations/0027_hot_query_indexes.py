@@ -0,0 +1,49 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_private_media_indexes'),
+    ]
+
+    # The withdrawal and support queues have (status, created_at, id)
+    # since 0017 and 0018. core.query_plans checks every one of these.
+    operations = [
+        # Payment verification queue, newest first per status
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_payment_status_created_idx '
+            'ON core_paymentrequest (status, created_at, id);',
+            'DROP INDEX IF EXISTS core_payment_status_created_idx;',
+        ),
+        # Order queue, newest first per status (0022's index leads with item)
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_order_status_created_idx '
+            'ON core_order (status, created_at, id);',
+            'DROP INDEX IF EXISTS core_order_status_created_idx;',
+        ),
+        # A player's wallet history
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_transaction_user_created_idx '
+            'ON core_transaction (user_id, created_at, id);',
+            'DROP INDEX IF EXISTS core_transaction_user_created_idx;',
+        ),
+        # Unread badge and unread list. Partial: Django writes is_read=False
+        # as NOT is_read, which can't seek an is_read index column
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_notification_unread_user_created_idx '
+            'ON core_notification (user_id, created_at, id) WHERE NOT is_read;',
+            'DROP INDEX IF EXISTS core_notification_unread_user_created_idx;',
+        ),
+        # Upcoming tournaments by date (home page, tournament list)
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_tournament_status_date_idx '
+            'ON core_tournament (status, tournament_date);',
+            'DROP INDEX IF EXISTS core_tournament_status_date_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_fulltournament_status_time_idx '
+            'ON core_fulltournament (status, game_time);',
+            'DROP INDEX IF EXISTS core_fulltournament_status_time_idx;',
+        ),
+    ]
@@ -0,0 +1,134 @@
+"""
+Full-page caching
+cached_page() keeps two rendered copies of a page: one for anonymous
+visitors and one shared by every signed-in user. The per-user bits of
+the header (coin balance, username, unread notifications) are written by
+{% deferred %} as placeholders while the shared copy renders and filled in
+per request by fill_deferred(), which costs a string substitution and at
+most one cached count.
+
+A copy is keyed on the path, the query string and the versions of the
+core.caching namespaces the page is built from, so bumping any of them
+retires it. Responses that set cookies, carry a CSRF token or flash
+messages are never stored, and pending messages bypass the cache.
+"""
+import re
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.html import escape, format_html
+
+from .caching import get_or_compute, invalidate, make_key, namespace_versions
+
+
+PAGE_NAMESPACE = 'page'
+
+ANONYMOUS_MAX_AGE = 60  # seconds, for browsers and shared caches
+
+NOTIFICATIONS_TIMEOUT = 30  # seconds; new notifications invalidate it sooner
+
+PLACEHOLDER = '<!--deferred:{}-->'
+_PLACEHOLDER_RE = re.compile(r'<!--deferred:([a-z_]+)-->')
+
+
+def _notifications_namespace(user_id):
+    return f'notifications.{user_id}'
+
+
+def unread_notifications(user):
+    from .models import Notification
+    return get_or_compute(
+        _notifications_namespace(user.pk), 'unread',
+        lambda: Notification.objects.filter(user_id=user.pk, is_read=False).count(),
+        NOTIFICATIONS_TIMEOUT,
+    )
+
+
+def invalidate_notifications(user_id):
+    invalidate(_notifications_namespace(user_id))
+
+
+def _notification_badge(request):
+    count = unread_notifications(request.user)
+    if not count:
+        return ''
+    return format_html('<span class="notification-badge">{}</span>', count if count < 100 else '99+')
+
+
+# name: request -> HTML
+DEFERRED = {
+    'coins': lambda request: escape(request.user.coins),
+    'username': lambda request: escape(request.user.username),
+    'notifications': _notification_badge,
+}
+
+
+def deferred_value(request, name):
+    if not request.user.is_authenticated:
+        return ''
+    return DEFERRED[name](request)
+
+
+def fill_deferred(content, request):
+    return _PLACEHOLDER_RE.sub(lambda match: str(deferred_value(request, match[1])), content)
+
+
+def is_deferring(request):
+    return getattr(request, '_defer_user_bits', False)
+
+
+def _cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.cookies
+        # get_token() was called, so the page holds this visitor's token
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def cached_page(namespaces, timeout):
+    """Cache a GET view's page per the module docstring"""
+    namespaces = tuple(namespaces)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or len(get_messages(request)):
+                return view(request, *args, **kwargs)
+
+            authenticated = request.user.is_authenticated
+            versions = namespace_versions(*namespaces)
+            key = make_key(
+                PAGE_NAMESPACE, 'user' if authenticated else 'anonymous', request.path,
+                request.META.get('QUERY_STRING', ''), *(versions[namespace] for namespace in namespaces),
+            )
+            cached = cache.get(key)
+            if cached is None:
+                request._defer_user_bits = True
+                try:
+                    response = view(request, *args, **kwargs)
+                    if hasattr(response, 'render') and callable(response.render):
+                        response.render()
+                finally:
+                    request._defer_user_bits = False
+                if response.streaming:
+                    return response
+                if not _cacheable(request, response):
+                    response.content = fill_deferred(response.content.decode(response.charset), request)
+                    return response
+                cached = (response.content.decode(response.charset), response['Content-Type'])
+                cache.set(key, cached, timeout)
+
+            content, content_type = cached
+            response = HttpResponse(fill_deferred(content, request), content_type=content_type)
+            patch_vary_headers(response, ('Cookie',))
+            if authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(response, public=True, max_age=ANONYMOUS_MAX_AGE)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,117 @@
+"""
+Keyset (seek) pagination for the admin queues
+Pages are addressed by the last row seen instead of an OFFSET, so page N
+costs the same as page 1 no matter how large the table grows.
+"""
+import base64
+import binascii
+
+from django.utils.dateparse import parse_datetime
+
+
+DEFAULT_PAGE_SIZE = 25
+
+
+def encode_cursor(value, pk):
+    """Encode a (datetime, pk) position as an opaque URL-safe token"""
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token, returning None when it is malformed"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset"""
+
+    def __init__(self, object_list, has_next, has_previous, field, params=None):
+        self.object_list = object_list
+        self.has_next = has_next and bool(object_list)
+        self.has_previous = has_previous and bool(object_list)
+        self.field = field
+        self.params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def _cursor(self, obj):
+        return encode_cursor(getattr(obj, self.field), obj.pk)
+
+    @property
+    def next_cursor(self):
+        return self._cursor(self.object_list[-1]) if self.has_next else None
+
+    @property
+    def previous_cursor(self):
+        return self._cursor(self.object_list[0]) if self.has_previous else None
+
+    def _querystring(self, key, cursor):
+        params = self.params.copy() if self.params is not None else None
+        if params is None:
+            return f'{key}={cursor}'
+        params.pop('after', None)
+        params.pop('before', None)
+        params[key] = cursor
+        return params.urlencode()
+
+    @property
+    def next_querystring(self):
+        return self._querystring('after', self.next_cursor) if self.has_next else ''
+
+    @property
+    def previous_querystring(self):
+        return self._querystring('before', self.previous_cursor) if self.has_previous else ''
+
+
+def paginate_keyset(queryset, params, field='created_at', per_page=DEFAULT_PAGE_SIZE):
+    """
+    Return a newest-first KeysetPage of ``queryset`` ordered by (field, pk).
+
+    ``params`` is the request's GET QueryDict; the ``after``/``before``
+    cursors are read from it and the other filters are carried over into
+    the next/previous links. The seek predicate is written as
+    ``field <= value AND NOT (field = value AND pk >= cursor_pk)`` so the
+    database can start a range scan on a (..., field, id) index.
+    """
+    after = decode_cursor(params.get('after'))
+    before = decode_cursor(params.get('before')) if after is None else None
+
+    if before is not None:
+        value, pk = before
+        rows = list(
+            queryset.filter(**{f'{field}__gte': value})
+            .exclude(**{field: value, 'pk__lte': pk})
+            .order_by(field, 'pk')[:per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return KeysetPage(rows, True, has_previous, field, params)
+
+    if after is not None:
+        value, pk = after
+        queryset = queryset.filter(**{f'{field}__lte': value}).exclude(
+            **{field: value, 'pk__gte': pk}
+        )
+
+    rows = list(queryset.order_by(f'-{field}', '-pk')[:per_page + 1])
+    has_next = len(rows) > per_page
+    return KeysetPage(rows[:per_page], has_next, after is not None, field, params)
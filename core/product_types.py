@@ -0,0 +1,69 @@
+"""
+Store product types
+Normalized replacement for the comma-separated Game.product_types text.
+Each game owns a list of ProductType rows and every StoreItem can be
+tagged with the types it belongs to. Game.product_types stays the
+admin's input format and is parsed by sync_product_types() whenever a
+Game is saved (core.signals).
+"""
+from django.db import models
+from django.utils.text import slugify
+
+
+class ProductType(models.Model):
+    """A product category within a game (e.g. DIAMONDS, UC, MEMBERSHIP)"""
+    game = models.ForeignKey('core.Game', on_delete=models.CASCADE, related_name='types')
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100)
+    display_order = models.IntegerField(default=0)
+    items = models.ManyToManyField('core.StoreItem', blank=True, related_name='product_types')
+
+    class Meta:
+        app_label = 'core'
+        ordering = ['display_order', 'name']
+        constraints = [
+            models.UniqueConstraint(fields=['game', 'slug'], name='core_producttype_game_slug_uniq'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+def split_product_types(value):
+    """Parse the admin's comma-separated input into unique, ordered names"""
+    names, seen = [], set()
+    for name in (value or '').split(','):
+        name = name.strip()
+        if name and slugify(name) not in seen:
+            seen.add(slugify(name))
+            names.append(name)
+    return names
+
+
+def sync_product_types(game):
+    """Make ``game.types`` match ``game.product_types`` in a few bulk queries"""
+    names = split_product_types(game.product_types)
+    wanted = {slugify(name): (order, name) for order, name in enumerate(names)}
+    existing = {product_type.slug: product_type for product_type in game.types.all()}
+
+    ProductType.objects.filter(game=game).exclude(slug__in=wanted).delete()
+
+    changed = []
+    for slug, (order, name) in wanted.items():
+        product_type = existing.get(slug)
+        if product_type and (product_type.name, product_type.display_order) != (name, order):
+            product_type.name, product_type.display_order = name, order
+            changed.append(product_type)
+    ProductType.objects.bulk_update(changed, ['name', 'display_order'])
+    ProductType.objects.bulk_create([
+        ProductType(game=game, name=name, slug=slug, display_order=order)
+        for slug, (order, name) in wanted.items() if slug not in existing
+    ])
+
+
+def items_of_type(game, product_type_slug):
+    """Active items of one type, via the (game_id, is_active) and m2m indexes"""
+    from .models import StoreItem
+    return StoreItem.objects.filter(
+        game=game, is_active=True, product_types__slug=product_type_slug
+    )
@@ -0,0 +1,120 @@
+"""
+Store purchases
+StoreItem.quantity is the pack size (100 diamonds, 60 UC), so limited
+stock for flash sales lives in a separate ItemStock row; items without
+one are unlimited. A purchase decrements stock and coins with guarded
+UPDATEs (``... WHERE remaining >= n`` / ``... WHERE coins >= total``)
+inside one transaction. The database evaluates each guard against the
+latest committed row, so concurrent buyers can never oversell an item
+or overdraw a balance, and no explicit locks or retries are needed.
+"""
+from django.db import models, transaction
+from django.db.models import F
+
+from .ids import new_order_id
+
+
+class ItemStock(models.Model):
+    """Remaining units of a limited store item"""
+    item = models.OneToOneField('core.StoreItem', on_delete=models.CASCADE, primary_key=True, related_name='stock')
+    remaining = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        app_label = 'core'
+
+    def __str__(self):
+        return f'{self.item} ({self.remaining} left)'
+
+
+class PurchaseError(Exception):
+    """A purchase that was refused; ``code`` is one of the PurchaseResult codes"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+class PurchaseResult:
+    OK = 'ok'
+    UNAVAILABLE = 'unavailable'
+    SOLD_OUT = 'sold_out'
+    INSUFFICIENT_FUNDS = 'insufficient_funds'
+
+    MESSAGES = {
+        OK: 'Purchase successful!',
+        UNAVAILABLE: 'This item is not available.',
+        SOLD_OUT: 'Sorry, this item is sold out.',
+        INSUFFICIENT_FUNDS: 'Insufficient coins for this purchase.',
+    }
+
+    def __init__(self, code, order=None, balance=None):
+        self.code = code
+        self.order = order
+        self.balance = balance
+
+    def __bool__(self):
+        return self.code == self.OK
+
+    @property
+    def message(self):
+        return self.MESSAGES[self.code]
+
+
+def purchase_item(user, item, in_game_id, in_game_name='', quantity=1):
+    """
+    Buy ``quantity`` packs of ``item`` for ``user``.
+
+    Returns a PurchaseResult; on success ``order`` is the new Order and
+    ``balance`` the user's coins afterwards. ``user.coins`` is refreshed
+    in place.
+    """
+    from .models import Order, Transaction, User
+
+    if not item.is_active or quantity < 1:
+        return PurchaseResult(PurchaseResult.UNAVAILABLE)
+    total_price = item.price * quantity
+    order_id = new_order_id()
+
+    try:
+        with transaction.atomic():
+            claimed = ItemStock.objects.filter(item_id=item.pk, remaining__gte=quantity).update(
+                remaining=F('remaining') - quantity
+            )
+            if not claimed and ItemStock.objects.filter(item_id=item.pk).exists():
+                raise PurchaseError(PurchaseResult.SOLD_OUT)
+
+            charged = User.objects.filter(pk=user.pk, coins__gte=total_price).update(
+                coins=F('coins') - total_price
+            )
+            if not charged:
+                raise PurchaseError(PurchaseResult.INSUFFICIENT_FUNDS)
+            user.coins = User.objects.values_list('coins', flat=True).get(pk=user.pk)
+
+            order = Order.objects.create(
+                order_id=order_id,
+                user=user,
+                item=item,
+                quantity=quantity,
+                total_price=total_price,
+                in_game_id=in_game_id,
+                in_game_name=in_game_name,
+            )
+            Transaction.objects.create(
+                user=user,
+                transaction_type='store_purchase',
+                amount=-total_price,
+                description=f'Purchased {item.name} (Order: {order.order_id})',
+                balance_after=user.coins,
+            )
+    except PurchaseError as e:
+        return PurchaseResult(e.code)
+
+    return PurchaseResult(PurchaseResult.OK, order=order, balance=user.coins)
+
+
+def set_stock(item, remaining):
+    """Limit ``item`` to ``remaining`` units; None makes it unlimited again"""
+    if remaining is None:
+        ItemStock.objects.filter(item_id=item.pk).delete()
+    else:
+        ItemStock.objects.update_or_create(item_id=item.pk, defaults={'remaining': remaining})
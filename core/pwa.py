@@ -0,0 +1,106 @@
+"""
+Installable web app
+The web app manifest and the service worker, both served from the site
+root so the worker's scope covers every page. The worker (template
+pwa/service_worker.js) gets its configuration from here:
+
+    precache    offline page, the built shell bundles (core.assets), app
+                and game icons under static/images/
+    cacheFirst  fingerprinted bundles and static images
+    swrPages    list pages answered from cache and refreshed in the
+                background (stale-while-revalidate)
+    resetPages  URLs after which cached pages are dropped (login/logout),
+                as they show the signed-in user's chrome; any non-GET
+                request drops them too
+
+The cache name is derived from the precache list, so a new build_assets
+run installs a fresh cache and deletes the old one.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.shortcuts import render
+from django.http import JsonResponse
+from django.templatetags.static import static
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+
+from .assets import bundle_paths
+
+
+SHELL_BUNDLES = ('site.css', 'site.js', 'icons.css')
+SWR_PAGES = ('tournaments', 'store')
+RESET_PAGES = ('login', 'logout')
+
+APP_ICONS = ((192, 'images/app-icon-192.png'), (512, 'images/app-icon-512.png'))
+IMAGES_DIR = 'images'
+
+# Matches the splash screen
+THEME_COLOR = '#0118D8'
+
+
+def shell_bundle_paths():
+    paths = []
+    for name in SHELL_BUNDLES:
+        sources = bundle_paths(name)
+        # icons.css before build_icons has run: the CDN stylesheet is used instead
+        if all((Path(settings.STATICFILES_DIRS[0]) / path).exists() for path in sources):
+            paths.extend(sources)
+    return paths
+
+
+def image_paths():
+    images = Path(settings.STATICFILES_DIRS[0]) / IMAGES_DIR
+    return sorted(f'{IMAGES_DIR}/{path.name}' for path in images.iterdir() if path.is_file())
+
+
+def precache_urls():
+    return [reverse('offline')] + [static(path) for path in shell_bundle_paths() + image_paths()]
+
+
+def worker_config():
+    precache = precache_urls()
+    return {
+        'version': hashlib.sha256('\n'.join(precache).encode()).hexdigest()[:12],
+        'precache': precache,
+        'offline': reverse('offline'),
+        'cacheFirst': [static('dist/'), static(f'{IMAGES_DIR}/')],
+        'static': static(''),
+        'swrPages': [reverse(name) for name in SWR_PAGES],
+        'resetPages': [reverse(name) for name in RESET_PAGES],
+    }
+
+
+@cache_control(no_cache=True)
+def service_worker(request):
+    response = render(
+        request, 'pwa/service_worker.js', {'config': json.dumps(worker_config(), indent=4)},
+        content_type='application/javascript',
+    )
+    response['Service-Worker-Allowed'] = '/'
+    return response
+
+
+@cache_control(max_age=60 * 60 * 24)
+def manifest(request):
+    return JsonResponse({
+        'name': 'IGS OP',
+        'short_name': 'IGS OP',
+        'description': 'Compete, win, and earn coins and in-game items',
+        'start_url': reverse('home') + '?source=pwa',
+        'scope': '/',
+        'display': 'standalone',
+        'orientation': 'portrait',
+        'background_color': THEME_COLOR,
+        'theme_color': THEME_COLOR,
+        'icons': [
+            {'src': static(path), 'sizes': f'{size}x{size}', 'type': 'image/png', 'purpose': 'any maskable'}
+            for size, path in APP_ICONS
+        ],
+    }, content_type='application/manifest+json')
+
+
+def offline(request):
+    return render(request, 'pwa/offline.html')
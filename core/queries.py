@@ -0,0 +1,68 @@
+"""
+Shared query helpers for the admin panels
+Grouped status statistics and index-friendly search predicates.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+
+STATUS_SUMMARY_TIMEOUT = 30  # seconds
+
+# Highest code point; appended to a prefix to form an exclusive upper bound
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def _status_summary_key(model):
+    return f'status_summary:{model._meta.label_lower}'
+
+
+def status_summary(model, sum_field=None, timeout=STATUS_SUMMARY_TIMEOUT):
+    """
+    Per-status counts (and optional sums) for ``model`` from one GROUP BY.
+
+    Returns ``{status: {'count': n, 'total': sum}}``. The result is cached
+    for ``timeout`` seconds and dropped by invalidate_status_summary()
+    whenever a row of ``model`` is saved or deleted.
+    """
+    key = _status_summary_key(model)
+    summary = cache.get(key)
+    if summary is None:
+        annotations = {'count': Count('pk')}
+        if sum_field:
+            annotations['total'] = Sum(sum_field)
+        rows = model.objects.order_by().values('status').annotate(**annotations)
+        summary = {
+            row['status']: {'count': row['count'], 'total': row.get('total') or 0}
+            for row in rows
+        }
+        cache.set(key, summary, timeout)
+    return summary
+
+
+def invalidate_status_summary(model):
+    """Drop the cached status summary for ``model``"""
+    cache.delete(_status_summary_key(model))
+
+
+def cached_count(model, timeout=STATUS_SUMMARY_TIMEOUT):
+    """Row count of ``model``, recomputed at most once per ``timeout`` seconds"""
+    return cache.get_or_set(f'row_count:{model._meta.label_lower}', model.objects.count, timeout)
+
+
+def status_count(summary, status):
+    return summary.get(status, {}).get('count', 0)
+
+
+def status_total(summary, status):
+    return summary.get(status, {}).get('total', 0)
+
+
+def prefix_q(field, term):
+    """
+    Case-sensitive prefix match as a half-open range on ``field``.
+
+    ``field >= term AND field < term + U+10FFFF`` can seek a plain B-tree
+    index, unlike ``LIKE 'term%'`` (case-insensitive on SQLite) or
+    ``icontains`` which always scan.
+    """
+    return Q(**{f'{field}__gte': term, f'{field}__lt': term + PREFIX_UPPER_BOUND})
@@ -0,0 +1,77 @@
+"""
+Query plan checks
+HOT_QUERIES are the status/owner filters with a time ordering that the
+admin queues and player pages run on every request, each backed by a
+composite index (migrations 0017, 0018 and 0027). plan_problems() asks the
+database how it would run one and reports a full table scan or a separate
+sort step; ``manage.py check_query_plans`` runs them all and fails on
+any, so a dropped or reordered index shows up before it reaches
+production.
+
+PostgreSQL prefers sequential scans on small tables whatever the indexes,
+so its plans are taken with enable_seqscan off.
+"""
+import re
+
+from django.apps import apps
+from django.db import connection, transaction
+
+
+PAGE = 25
+
+# name: (model label, filters, ordering)
+HOT_QUERIES = {
+    'payment queue': ('core.PaymentRequest', {'status': 'pending'}, ('-created_at',)),
+    'order queue': ('core.Order', {'status': 'pending'}, ('-created_at',)),
+    'withdrawal queue': ('core.WithdrawalRequest', {'status': 'pending'}, ('created_at', 'id')),
+    'support inbox': ('core.ChatMessage', {'status': 'replied'}, ('created_at', 'id')),
+    'wallet history': ('core.Transaction', {'user_id': 1}, ('-created_at',)),
+    'unread notifications': ('core.Notification', {'user_id': 1, 'is_read': False}, ('-created_at',)),
+    'upcoming tournaments': ('core.Tournament', {'status': 'upcoming'}, ('tournament_date',)),
+    'upcoming full tournaments': ('core.FullTournament', {'status': 'not_started'}, ('game_time',)),
+}
+
+# SQLite: "SCAN core_order" (3.36+) or "SCAN TABLE core_order" is a full
+# scan, "USE TEMP B-TREE FOR ORDER BY" a sort
+_SQLITE_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)')
+_SQLITE_SORT = 'USE TEMP B-TREE'
+_POSTGRESQL_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+_POSTGRESQL_SORT_RE = re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b', re.M)
+
+
+def hot_queryset(name):
+    label, filters, ordering = HOT_QUERIES[name]
+    return apps.get_model(label)._base_manager.filter(**filters).order_by(*ordering)[:PAGE]
+
+
+def explain(queryset):
+    """The database's plan for ``queryset`` as text"""
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+    return queryset.explain()
+
+
+def plan_problems(plan, table, vendor=None):
+    """Full scans of ``table`` and sort steps in ``plan``"""
+    vendor = vendor or connection.vendor
+    problems = []
+    if vendor == 'sqlite':
+        if table in _SQLITE_SCAN_RE.findall(plan):
+            problems.append(f'full scan of {table}')
+        if _SQLITE_SORT in plan:
+            problems.append('sorts in a temporary b-tree')
+    elif vendor == 'postgresql':
+        if table in _POSTGRESQL_SCAN_RE.findall(plan):
+            problems.append(f'sequential scan of {table}')
+        if _POSTGRESQL_SORT_RE.search(plan):
+            problems.append('sorts the rows')
+    return problems
+
+
+def check(name):
+    """(plan, problems) for hot query ``name``"""
+    queryset = hot_queryset(name)
+    plan = explain(queryset)
+    return plan, plan_problems(plan, queryset.model._meta.db_table)
@@ -0,0 +1,96 @@
+"""
+Payment screenshot fingerprints
+A 64-bit difference hash (dHash) of every payment screenshot, so staff see
+at a glance when a "new" screenshot is an earlier one re-sent, cropped or
+recompressed. The hash is also stored as four 16-bit bands, each indexed.
+Two hashes within Hamming distance 3 must agree exactly on at least one
+band, so a lookup is four index probes plus a popcount over the handful of
+candidates instead of a scan over every historical screenshot.
+"""
+from django.db import models
+from django.db.models import Q
+
+
+HASH_BITS = 64
+BAND_BITS = 16
+BANDS = HASH_BITS // BAND_BITS
+
+# Largest Hamming distance reported as a match; anything up to
+# BANDS - 1 is guaranteed to be found, larger ones usually are
+MAX_DISTANCE = 5
+
+
+class ScreenshotHash(models.Model):
+    """dHash (core.images.dhash) of one PaymentRequest.payment_screenshot"""
+    payment = models.OneToOneField(
+        'core.PaymentRequest', on_delete=models.CASCADE, primary_key=True, related_name='screenshot_hash'
+    )
+    value = models.BigIntegerField()
+    band0 = models.IntegerField(db_index=True)
+    band1 = models.IntegerField(db_index=True)
+    band2 = models.IntegerField(db_index=True)
+    band3 = models.IntegerField(db_index=True)
+
+    class Meta:
+        app_label = 'core'
+
+    def __str__(self):
+        return f'{self.payment_id}: {unsigned(self.value):016x}'
+
+
+def signed(value):
+    """Unsigned 64-bit hash -> BigIntegerField range"""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def unsigned(value):
+    return value & ((1 << HASH_BITS) - 1)
+
+
+def bands(value):
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (BAND_BITS * i)) & mask for i in range(BANDS)]
+
+
+def store_hash(payment_id, value):
+    """Record the (unsigned) dHash of a payment's screenshot"""
+    fields = {f'band{i}': band for i, band in enumerate(bands(value))}
+    ScreenshotHash.objects.update_or_create(payment_id=payment_id, defaults={'value': signed(value), **fields})
+
+
+def distance(a, b):
+    return bin(unsigned(a) ^ unsigned(b)).count('1')
+
+
+def earlier_matches(payment_ids, max_distance=MAX_DISTANCE):
+    """
+    ``{payment_id: [ScreenshotHash, ...]}`` of older payments whose
+    screenshot is within ``max_distance`` bits of each given payment's,
+    closest first. One query for the given hashes, one for all candidates.
+    """
+    hashes = list(ScreenshotHash.objects.filter(payment_id__in=payment_ids))
+    if not hashes:
+        return {}
+
+    band_values = [set() for _ in range(BANDS)]
+    for h in hashes:
+        for i, band in enumerate(bands(unsigned(h.value))):
+            band_values[i].add(band)
+    candidates_q = Q()
+    for i, values in enumerate(band_values):
+        candidates_q |= Q(**{f'band{i}__in': values})
+    candidates = list(
+        ScreenshotHash.objects.filter(candidates_q, payment_id__lt=max(h.payment_id for h in hashes))
+        .select_related('payment', 'payment__user')
+    )
+
+    matches = {}
+    for h in hashes:
+        found = [
+            (distance(h.value, candidate.value), candidate) for candidate in candidates
+            if candidate.payment_id < h.payment_id
+        ]
+        found = sorted((pair for pair in found if pair[0] <= max_distance), key=lambda pair: pair[0])
+        if found:
+            matches[h.payment_id] = [candidate for _, candidate in found]
+    return matches
@@ -0,0 +1,325 @@
+"""
+Full-text search
+Each registered index is a side table keyed by the source row's primary
+key: an FTS5 virtual table on SQLite, a tsvector column with a GIN index
+on PostgreSQL. Trigram indexes match arbitrary substrings of three or
+more characters instead of word prefixes (FTS5 ``trigram`` tokenizer,
+``pg_trgm`` on PostgreSQL). Rows are kept in sync by the post_save/post_delete
+handlers in core.signals; ``manage.py rebuild_search_index`` repopulates
+a table after bulk ``QuerySet.update()`` calls that bypass signals.
+"""
+import re
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection as default_connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+
+SEARCH_RESULT_LIMIT = 200
+
+# Shortest substring a trigram index can match
+MIN_TRIGRAM_LENGTH = 3
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchIndex:
+    """A searchable projection of a model's text columns"""
+
+    def __init__(self, name, model_label, fields, trigram=False):
+        self.name = name
+        self.model_label = model_label
+        self.fields = fields
+        self.trigram = trigram
+
+    @property
+    def table(self):
+        return f'core_search_{self.name}'
+
+    def get_model(self, app_registry=apps):
+        return app_registry.get_model(self.model_label)
+
+    def values(self, obj):
+        return [str(getattr(obj, field) or '') for field in self.fields]
+
+
+SEARCH_INDEXES = {
+    index.name: index for index in [
+        SearchIndex('chat', 'core.ChatMessage', ['subject', 'message', 'admin_reply']),
+        SearchIndex('transaction', 'core.Transaction', ['description']),
+        SearchIndex('payment', 'core.PaymentRequest', ['transaction_id', 'payment_method', 'admin_notes']),
+        SearchIndex('order', 'core.Order', ['order_id', 'in_game_id', 'in_game_name', 'admin_notes']),
+        SearchIndex('user', 'core.User', ['username', 'email', 'user_id', 'phone', 'referral_code'], trigram=True),
+    ]
+}
+
+
+def tokenize(query, trigram=False):
+    """
+    Split a search box string into lowercase tokens: words for regular
+    indexes, whitespace-separated chunks of MIN_TRIGRAM_LENGTH or more
+    characters for trigram indexes.
+    """
+    if trigram:
+        return [chunk for chunk in query.lower().split() if len(chunk) >= MIN_TRIGRAM_LENGTH]
+    return _TOKEN_RE.findall(query.lower())
+
+
+class SQLiteBackend:
+    """SQLite FTS5 virtual tables ranked with bm25()"""
+
+    def create(self, cursor, index):
+        columns = ', '.join(index.fields)
+        tokenizer = 'trigram' if index.trigram else 'unicode61 remove_diacritics 2'
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.table} "
+            f"USING fts5({columns}, tokenize='{tokenizer}')"
+        )
+
+    def drop(self, cursor, index):
+        cursor.execute(f'DROP TABLE IF EXISTS {index.table}')
+
+    def rebuild(self, cursor, index, source_table):
+        columns = ', '.join(index.fields)
+        cursor.execute(f'DELETE FROM {index.table}')
+        cursor.execute(
+            f'INSERT INTO {index.table} (rowid, {columns}) '
+            f'SELECT id, {columns} FROM {source_table}'
+        )
+
+    def update(self, cursor, index, pk, values):
+        placeholders = ', '.join(['%s'] * len(values))
+        cursor.execute(f'DELETE FROM {index.table} WHERE rowid = %s', [pk])
+        cursor.execute(
+            f"INSERT INTO {index.table} (rowid, {', '.join(index.fields)}) "
+            f"VALUES (%s, {placeholders})",
+            [pk, *values],
+        )
+
+    def delete(self, cursor, index, pk):
+        cursor.execute(f'DELETE FROM {index.table} WHERE rowid = %s', [pk])
+
+    def match(self, index, tokens):
+        # Quote every token so user input can't inject FTS5 syntax; the
+        # trailing * makes each token a prefix match. Trigram tokens are
+        # already substring matches.
+        suffix = '' if index.trigram else '*'
+        match = ' '.join('"{}"{}'.format(token.replace('"', '""'), suffix) for token in tokens)
+        return f'SELECT rowid FROM {index.table} WHERE {index.table} MATCH %s', [match]
+
+    def search(self, cursor, index, tokens, limit):
+        sql, params = self.match(index, tokens)
+        cursor.execute(f'{sql} ORDER BY bm25({index.table}) LIMIT %s', [*params, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLBackend:
+    """PostgreSQL tsvector tables ranked with ts_rank()"""
+
+    config = 'simple'
+
+    def _document_sql(self, index, fields):
+        text = f"concat_ws(' ', {', '.join(fields)})"
+        if index.trigram:
+            return f'lower({text})'
+        return f"to_tsvector('{self.config}', {text})"
+
+    def create(self, cursor, index):
+        if index.trigram:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            column, opclass = 'text', 'gin_trgm_ops'
+        else:
+            column, opclass = 'tsvector', ''
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {index.table} '
+            f'(object_id bigint PRIMARY KEY, document {column} NOT NULL)'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index.table}_document_idx '
+            f'ON {index.table} USING GIN (document {opclass})'
+        )
+
+    def drop(self, cursor, index):
+        cursor.execute(f'DROP TABLE IF EXISTS {index.table}')
+
+    def rebuild(self, cursor, index, source_table):
+        cursor.execute(f'TRUNCATE {index.table}')
+        cursor.execute(
+            f'INSERT INTO {index.table} (object_id, document) '
+            f'SELECT id, {self._document_sql(index, index.fields)} FROM {source_table}'
+        )
+
+    def update(self, cursor, index, pk, values):
+        placeholders = ['%s::text'] * len(values)
+        cursor.execute(
+            f'INSERT INTO {index.table} (object_id, document) '
+            f'VALUES (%s, {self._document_sql(index, placeholders)}) '
+            f'ON CONFLICT (object_id) DO UPDATE SET document = EXCLUDED.document',
+            [pk, *values],
+        )
+
+    def delete(self, cursor, index, pk):
+        cursor.execute(f'DELETE FROM {index.table} WHERE object_id = %s', [pk])
+
+    def _trigram_patterns(self, tokens):
+        return [
+            '%{}%'.format(token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_'))
+            for token in tokens
+        ]
+
+    def match(self, index, tokens):
+        if index.trigram:
+            patterns = self._trigram_patterns(tokens)
+            where = ' AND '.join(['document LIKE %s'] * len(patterns))
+            return f'SELECT object_id FROM {index.table} WHERE {where}', patterns
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        return (
+            f"SELECT object_id FROM {index.table}, to_tsquery('{self.config}', %s) query "
+            f'WHERE document @@ query',
+            [query],
+        )
+
+    def search(self, cursor, index, tokens, limit):
+        sql, params = self.match(index, tokens)
+        if index.trigram:
+            cursor.execute(
+                f'{sql} ORDER BY similarity(document, %s) DESC LIMIT %s',
+                [*params, ' '.join(tokens), limit],
+            )
+        else:
+            cursor.execute(f'{sql} ORDER BY ts_rank(document, query) DESC LIMIT %s', [*params, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend(),
+    'postgresql': PostgreSQLBackend(),
+}
+
+
+def get_backend(connection=None):
+    connection = connection or default_connection
+    try:
+        return BACKENDS[connection.vendor]
+    except KeyError:
+        raise ImproperlyConfigured(f'Full-text search is not supported on {connection.vendor}')
+
+
+def get_index(name):
+    return SEARCH_INDEXES[name]
+
+
+def indexes_for_model(model):
+    label = model._meta.label
+    return [index for index in SEARCH_INDEXES.values() if index.model_label == label]
+
+
+def is_indexed(model):
+    return any(index.model_label == model._meta.label for index in SEARCH_INDEXES.values())
+
+
+def create_index(connection, name, app_registry=apps, rebuild=True):
+    """Create (and optionally populate) one search table"""
+    backend = get_backend(connection)
+    index = get_index(name)
+    with connection.cursor() as cursor:
+        backend.create(cursor, index)
+        if rebuild:
+            backend.rebuild(cursor, index, index.get_model(app_registry)._meta.db_table)
+
+
+def drop_index(connection, name):
+    with connection.cursor() as cursor:
+        get_backend(connection).drop(cursor, get_index(name))
+
+
+def create_indexes(connection, app_registry=apps, rebuild=True):
+    for name in SEARCH_INDEXES:
+        create_index(connection, name, app_registry, rebuild)
+
+
+def drop_indexes(connection):
+    for name in SEARCH_INDEXES:
+        drop_index(connection, name)
+
+
+def rebuild_index(name, connection=None):
+    connection = connection or default_connection
+    index = get_index(name)
+    with connection.cursor() as cursor:
+        get_backend(connection).rebuild(cursor, index, index.get_model()._meta.db_table)
+
+
+def update_object(obj):
+    """Re-index ``obj`` in every index registered for its model"""
+    backend = get_backend()
+    with default_connection.cursor() as cursor:
+        for index in indexes_for_model(type(obj)):
+            backend.update(cursor, index, obj.pk, index.values(obj))
+
+
+def delete_object(model, pk):
+    backend = get_backend()
+    with default_connection.cursor() as cursor:
+        for index in indexes_for_model(model):
+            backend.delete(cursor, index, pk)
+
+
+def search(name, query, limit=SEARCH_RESULT_LIMIT):
+    """Primary keys matching ``query`` in index ``name``, best match first"""
+    index = get_index(name)
+    tokens = tokenize(query, trigram=index.trigram)
+    if not tokens:
+        return []
+    with default_connection.cursor() as cursor:
+        return get_backend().search(cursor, index, tokens, limit)
+
+
+def matching(name, query):
+    """
+    Subquery of every primary key matching ``query`` in index ``name``,
+    unranked and unlimited (for ``pk__in``), or None without any tokens
+    """
+    index = get_index(name)
+    tokens = tokenize(query, trigram=index.trigram)
+    if not tokens:
+        return None
+    return RawSQL(*get_backend().match(index, tokens))
+
+
+def order_by_rank(queryset, ranked_ids):
+    """Order ``queryset`` by position in ``ranked_ids``; unranked rows last"""
+    if not ranked_ids:
+        return queryset
+    rank = Case(
+        *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ranked_ids)],
+        default=Value(len(ranked_ids)),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(search_rank=rank).order_by('search_rank', '-pk')
+
+
+class FullTextSearchMixin:
+    """
+    ModelAdmin mixin that answers the changelist search box from a
+    full-text index instead of OR'd icontains predicates.
+
+    ``search_index`` names the index; ``exact_search_fields`` are matched
+    by equality (indexed columns) in addition to the full-text hits. Every
+    hit is kept (a subquery, not search()'s ranked top SEARCH_RESULT_LIMIT),
+    as the changelist paginates and orders them itself.
+    """
+    search_index = None
+    exact_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        hits = matching(self.search_index, search_term)
+        matches = Q(pk__in=[] if hits is None else hits)
+        for field in self.exact_search_fields:
+            matches |= Q(**{field: search_term})
+        return queryset.filter(matches), False
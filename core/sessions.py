@@ -0,0 +1,80 @@
+"""
+Sessions and the request user
+Sessions use the cached_db engine (see settings), so a session is read
+from the cache and only written through to the database. On top of that
+CachedAuthenticationMiddleware loads request.user from cached_user()
+instead of querying the User row on every request: the user is cached
+per session id in the namespace ``user.<id>`` (core.caching), and
+invalidate_user() drops it for all of that user's sessions. Signals call
+it whenever a User is saved (profile edits, coin adjustments, password
+changes) and whenever a Transaction records a wallet change, which
+covers balance updates done with queryset.update().
+
+A cached user is only trusted while the session's auth hash and backend
+still match it; otherwise Django's own get_user() decides, which flushes
+sessions invalidated by a password change.
+
+clear_expired_sessions() deletes expired sessions in small batches so
+each delete holds the SQLite write lock only briefly.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from .caching import get_or_compute, invalidate
+
+
+USER_TIMEOUT = 5 * 60
+
+SESSION_DELETE_BATCH = 1000
+
+
+def _user_namespace(user_id):
+    return f'user.{user_id}'
+
+
+def invalidate_user(user_id):
+    invalidate(_user_namespace(user_id))
+
+
+def user_timeout():
+    return getattr(settings, 'USER_CACHE_TIMEOUT', USER_TIMEOUT)
+
+
+def _still_valid(request, user):
+    session = request.session
+    if not user.is_authenticated or session.get(auth.BACKEND_SESSION_KEY) not in settings.AUTHENTICATION_BACKENDS:
+        return False
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    return bool(session_hash) and constant_time_compare(session_hash, user.get_session_auth_hash())
+
+
+def cached_user(request):
+    """request.user, from the cache when this session's user is in it"""
+    session = request.session
+    user_id = session.get(auth.SESSION_KEY)
+    if user_id is None or session.session_key is None:
+        return auth.get_user(request)
+
+    user = get_or_compute(
+        _user_namespace(user_id), session.session_key, lambda: auth.get_user(request), user_timeout(),
+    )
+    if not _still_valid(request, user):
+        # Password changed, backend removed or the session was flushed
+        return auth.get_user(request)
+    return user
+
+
+def clear_expired_sessions(batch_size=SESSION_DELETE_BATCH):
+    """Delete expired sessions in batches of ``batch_size``; returns the count"""
+    now = timezone.now()
+    deleted = 0
+    while True:
+        keys = list(
+            Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            return deleted
+        deleted += Session.objects.filter(session_key__in=keys).delete()[0]
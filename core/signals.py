@@ -0,0 +1,120 @@
+"""
+Model signal handlers
+Connected from CoreConfig.ready(). Cache invalidations wait for the
+transaction to commit: bumped earlier, a concurrent request could miss
+and re-cache the rows as they were before the commit.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import search, uploads
+from .catalog import invalidate_catalog
+from .dashboard import invalidate_dashboard
+from .home import invalidate_featured, invalidate_slides, invalidate_tournaments
+from .models import (
+    ChatMessage, Game, Notification, Order, PaymentRequest, SliderImage, StoreItem, Tournament,
+    TournamentParticipant, Transaction, User, WithdrawalRequest,
+)
+from .page_cache import invalidate_notifications
+from .product_types import ProductType, sync_product_types
+from .queries import invalidate_status_summary
+from .sessions import invalidate_user
+
+
+@receiver([post_save, post_delete], sender=WithdrawalRequest)
+def withdrawal_changed(sender, **kwargs):
+    """Keep the withdrawal queue statistics fresh"""
+    transaction.on_commit(lambda: invalidate_status_summary(WithdrawalRequest))
+
+
+@receiver([post_save, post_delete], sender=ChatMessage)
+def chat_message_changed(sender, **kwargs):
+    """Keep the support inbox statistics fresh"""
+    transaction.on_commit(lambda: invalidate_status_summary(ChatMessage))
+
+
+@receiver(post_save, sender=Game)
+def game_saved(sender, instance, **kwargs):
+    """Keep the ProductType rows in step with Game.product_types"""
+    sync_product_types(instance)
+
+
+@receiver([post_save, post_delete], sender=Game)
+@receiver([post_save, post_delete], sender=StoreItem)
+@receiver([post_save, post_delete], sender=ProductType)
+@receiver(m2m_changed, sender=ProductType.items.through)
+def catalog_changed(sender, **kwargs):
+    """Drop the cached store catalog tree"""
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver([post_save, post_delete], sender=SliderImage)
+def slides_changed(sender, **kwargs):
+    """Re-render the home page slider"""
+    transaction.on_commit(invalidate_slides)
+
+
+@receiver([post_save, post_delete], sender=Tournament)
+@receiver([post_save, post_delete], sender=TournamentParticipant)
+def tournaments_changed(sender, **kwargs):
+    """Re-render the home page's upcoming tournaments"""
+    transaction.on_commit(invalidate_tournaments)
+
+
+@receiver([post_save, post_delete], sender=StoreItem)
+def featured_items_changed(sender, **kwargs):
+    """Re-render the home page's featured items"""
+    transaction.on_commit(invalidate_featured)
+
+
+@receiver([post_save, post_delete], sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    """Refresh the unread badge; bulk creates and updates wait for its timeout"""
+    transaction.on_commit(lambda: invalidate_notifications(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Drop the cached request user once the change is committed"""
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+
+
+@receiver(post_save, sender=Transaction)
+def wallet_changed(sender, instance, **kwargs):
+    """Balance updates done with queryset.update() skip User's signals"""
+    transaction.on_commit(lambda: invalidate_user(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=PaymentRequest)
+@receiver([post_save, post_delete], sender=Order)
+@receiver([post_save, post_delete], sender=Tournament)
+def dashboard_changed(sender, **kwargs):
+    """Drop the cached admin dashboard statistics"""
+    transaction.on_commit(invalidate_dashboard)
+
+
+@receiver(post_save)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Re-index rows of models registered in core.search"""
+    if not raw and search.is_indexed(sender):
+        search.update_object(instance)
+
+
+@receiver(post_delete)
+def remove_from_search_index(sender, instance, **kwargs):
+    if search.is_indexed(sender):
+        search.delete_object(sender, instance.pk)
+
+
+@receiver(pre_save)
+def note_new_uploads(sender, instance, raw=False, **kwargs):
+    if not raw and uploads.fields_for(sender):
+        uploads.note_new_uploads(instance)
+
+
+@receiver(post_save)
+def normalize_new_uploads(sender, instance, raw=False, **kwargs):
+    """Recompress freshly uploaded images in the background"""
+    if not raw and uploads.fields_for(sender):
+        uploads.schedule_normalization(instance)
@@ -0,0 +1,107 @@
+"""
+SQLite backend tuned for concurrent writers
+ENGINE 'core.sqlite' is Django's SQLite backend plus, for every new
+connection, the PRAGMAS below (WAL so readers never block the writer,
+a busy timeout instead of immediate "database is locked" errors, a larger
+page cache and memory-mapped reads). Extra OPTIONS, removed before the
+rest reach sqlite3.connect():
+
+    pragmas           {name: value} merged over PRAGMAS
+    transaction_mode  'DEFERRED' (Django's default), 'IMMEDIATE' or
+                      'EXCLUSIVE'; IMMEDIATE takes the write lock at the
+                      start of an atomic block, so a transaction that
+                      reads then writes waits up front rather than
+                      failing when it upgrades (the name matches the
+                      option Django 5.1 added)
+    write_queue       True to also serialize this process's transactions
+                      on a lock, so its threads queue in order instead of
+                      polling the busy handler; other processes still
+                      wait on busy_timeout
+
+Single statements outside atomic() run in autocommit mode and rely on
+busy_timeout alone. ``manage.py benchmark_sqlite`` compares the modes.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # durable in WAL mode except on power loss
+    'busy_timeout': 5000,  # milliseconds
+    'cache_size': -64000,  # KiB when negative: 64 MB
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+EXTRA_OPTIONS = ('pragmas', 'transaction_mode', 'write_queue')
+
+# One per process; see write_queue above
+_write_lock = threading.Lock()
+
+
+def configure(conn, pragmas):
+    """Apply ``pragmas`` to a sqlite3 connection"""
+    for name, value in pragmas.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = {**PRAGMAS, **options.get('pragmas', {})}
+        self.transaction_mode = options.get('transaction_mode', 'DEFERRED').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f'transaction_mode must be one of {", ".join(TRANSACTION_MODES)}')
+        self.write_queue = options.get('write_queue', False)
+        self._holds_write_lock = False
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for option in EXTRA_OPTIONS:
+            kwargs.pop(option, None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        configure(conn, self.pragmas)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.write_queue and not self._holds_write_lock:
+            # Give up waiting after busy_timeout and let SQLite decide
+            timeout = int(self.pragmas.get('busy_timeout', 0)) / 1000
+            self._holds_write_lock = _write_lock.acquire(timeout=timeout)
+        try:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        except Exception:
+            self._release_write_lock()
+            raise
+
+    def _release_write_lock(self):
+        if self._holds_write_lock:
+            self._holds_write_lock = False
+            _write_lock.release()
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self._release_write_lock()
@@ -0,0 +1,73 @@
+"""
+Content-addressed media storage
+Uploads are stored as ``ab/cd/<sha256>.<ext>`` under MEDIA_ROOT instead of
+``<upload_to>/<original name>``: two levels of 256 shard directories keep
+every directory small, and identical uploads (the same icon for a game and
+a store item, a screenshot sent twice) are stored once.
+
+Because a file may be shared by several rows, delete() leaves
+content-addressed files alone; ``manage.py migrate_media --prune`` removes
+the ones no row refers to any more. Names under PASSTHROUGH_DIRS (generated
+files such as image derivatives, which pick their own names) are stored
+as-is.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+SHARDED_NAME_RE = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)?$')
+
+PASSTHROUGH_DIRS = ('derivatives',)
+
+
+def content_digest(content):
+    """SHA-256 of a File, read in chunks; leaves it rewound"""
+    sha = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        sha.update(chunk)
+    content.seek(0)
+    return sha.hexdigest()
+
+
+def sharded_name(digest, original_name):
+    ext = os.path.splitext(original_name)[1].lower()
+    return f'{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+def is_sharded(name):
+    return bool(SHARDED_NAME_RE.match(name.replace('\\', '/')))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def is_addressed(self, name):
+        return name.replace('\\', '/').split('/', 1)[0] not in PASSTHROUGH_DIRS
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not self.is_addressed(name):
+            return super().save(name, content, max_length)
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        name = sharded_name(content_digest(content), name)
+        if self.exists(name):
+            return name
+        return self._save(name, content)
+
+    def delete(self, name):
+        if is_sharded(name):
+            return  # may be shared; see migrate_media --prune
+        super().delete(name)
+
+    def delete_unreferenced(self, name):
+        """Remove a content-addressed file; callers check it is unused"""
+        super().delete(name)
@@ -0,0 +1,31 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core.assets import bundle_paths
+from core.icons import FONT_AWESOME_CDN, is_built
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def asset_css(name):
+    """Stylesheet link(s) for a core.assets bundle: {% asset_css 'site.css' %}"""
+    return format_html_join(
+        '\n', '<link rel="stylesheet" href="{}">', ((static(path),) for path in bundle_paths(name))
+    )
+
+
+@register.simple_tag
+def asset_js(name):
+    """Script tag(s) for a core.assets bundle: {% asset_js 'site.js' %}"""
+    return format_html_join('\n', '<script src="{}"></script>', ((static(path),) for path in bundle_paths(name)))
+
+
+@register.simple_tag
+def icon_css():
+    """The self-hosted icon subset (core.icons), or the CDN stylesheet until it's built"""
+    if is_built():
+        return asset_css('icons.css')
+    return format_html('<link rel="stylesheet" href="{}">', FONT_AWESOME_CDN)
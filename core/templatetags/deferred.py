@@ -0,0 +1,19 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core.page_cache import PLACEHOLDER, deferred_value, is_deferring
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def deferred(context, name):
+    """
+    A per-user header value ('coins', 'username', 'notifications'); a
+    placeholder while core.page_cache renders a shared copy of the page.
+    """
+    request = context['request']
+    if is_deferring(request):
+        return mark_safe(PLACEHOLDER.format(name))
+    return mark_safe(deferred_value(request, name))
@@ -0,0 +1,66 @@
+from django import template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core.images import FORMATS, RETINA_SIZES, SIZES, SLIDE_SIZES, derivative_url, width_srcset
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail(image, size='sm', fmt='webp'):
+    """URL of a resized copy of ``image``: {% thumbnail user.avatar 'xs' %}"""
+    return derivative_url(image, size, fmt)
+
+
+def _srcset(image, size, fmt):
+    retina = RETINA_SIZES.get(size)
+    if not retina:
+        return derivative_url(image, size, fmt)
+    return f'{derivative_url(image, size, fmt)} 1x, {derivative_url(image, retina, fmt)} 2x'
+
+
+@register.simple_tag
+def picture(image, size='sm', alt='', css_class='', lazy=True):
+    """
+    <picture> with a WebP source and a JPEG fallback, lazily loaded:
+    {% picture payment.payment_screenshot 'xs' alt='Payment Screenshot' %}
+    """
+    if not image:
+        return ''
+    width, height, crop = SIZES[size]
+    return format_html(
+        '<picture><source type="{}" srcset="{}">'
+        '<img src="{}" srcset="{}" alt="{}" class="{}"{} decoding="async"{}></picture>',
+        FORMATS['webp'][1],
+        _srcset(image, size, 'webp'),
+        derivative_url(image, size, 'jpeg'),
+        _srcset(image, size, 'jpeg'),
+        alt,
+        css_class,
+        format_html(' width="{}" height="{}"', width, height) if crop else '',
+        mark_safe(' loading="lazy"') if lazy else '',
+    )
+
+
+@register.simple_tag
+def slide_picture(image, alt='', css_class='', eager=False):
+    """
+    Full-width hero slide at 640/1280/1920px in WebP and JPEG. Only the
+    ``eager`` slide gets real sources; the others carry them in data-*
+    attributes so nothing downloads until the slider script shows them.
+    """
+    if not image:
+        return ''
+    prefix = '' if eager else 'data-'
+    return format_html(
+        '<picture><source type="{}" {}srcset="{}" sizes="100vw">'
+        '<img {}src="{}" {}srcset="{}" sizes="100vw" alt="{}" class="{}" width="{}" height="{}" decoding="async"{}>'
+        '</picture>',
+        FORMATS['webp'][1], prefix, width_srcset(image, SLIDE_SIZES, 'webp'),
+        prefix, derivative_url(image, SLIDE_SIZES[1], 'jpeg'),
+        prefix, width_srcset(image, SLIDE_SIZES, 'jpeg'),
+        alt, css_class, SIZES[SLIDE_SIZES[0]][0], SIZES[SLIDE_SIZES[0]][1],
+        mark_safe(' fetchpriority="high"') if eager else '',
+    )
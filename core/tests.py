@@ -0,0 +1,11 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class QueryPlanTests(TestCase):
+
+    def test_hot_queries_use_their_indexes(self):
+        # Raises CommandError when a hot query needs a full scan or a sort
+        call_command('check_query_plans', stdout=StringIO())
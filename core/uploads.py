@@ -0,0 +1,180 @@
+"""
+Upload normalization
+Freshly uploaded images are capped in size, rotated upright according to
+their EXIF orientation, stripped of metadata and recompressed: lossless PNG
+for QR codes (so they stay scannable), WebP for everything else. The Pillow
+work runs in a process pool after the upload's transaction commits, so the
+request returns as soon as the original file is stored. The normalized
+file is written to a temporary path, stored under its own (content
+addressed) name, never over the original, which other rows may share, and
+the row is then saved with it so the usual post_save handlers (search
+index, caches) run.
+
+core.signals notes uploads in pre_save (while the FieldFile is still
+uncommitted) and schedules them in post_save.
+"""
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from threading import Lock
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from .images import dhash
+
+
+logger = logging.getLogger(__name__)
+
+# model label: {field: (longest side in px, lossless)}
+NORMALIZED_FIELDS = {
+    'core.PaymentRequest': {'payment_screenshot': (1920, False)},
+    'core.TournamentResult': {'screenshot': (1920, False)},
+    'core.WithdrawalRequest': {'payment_qr': (1024, True)},
+    'core.PaymentMethod': {'qr_code': (1024, True)},
+    'core.Game': {'image': (1024, False)},
+    'core.StoreItem': {'image': (1024, False)},
+    'core.User': {'avatar': (512, False)},
+}
+
+# Fields whose perceptual hash is recorded (see core.screenshot_hashes)
+FINGERPRINTED_FIELDS = {('core.PaymentRequest', 'payment_screenshot')}
+
+WEBP_OPTIONS = {'quality': 85, 'method': 4}
+PNG_OPTIONS = {'optimize': True}
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    """Shared pool; spawned rather than forked so workers don't inherit the server's threads"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_NORMALIZE_WORKERS', 2),
+                mp_context=get_context('spawn'),
+            )
+    return _executor
+
+
+def normalize_image(source_path, target_path, max_size, lossless, fingerprint=False):
+    """
+    Write the normalized form of ``source_path`` to ``target_path``.
+
+    Runs in a worker process, so it only touches the filesystem. Returns
+    ``(written, dhash)``: ``written`` is False (and nothing was written)
+    when the file is already normalized or the result wouldn't be smaller;
+    ``dhash`` is None unless asked for.
+    """
+    tmp_path = f'{target_path}.tmp'
+    with Image.open(source_path) as image:
+        # Already normalized (e.g. a second normalize_uploads run)
+        done = image.format == ('PNG' if lossless else 'WEBP') and max(image.size) <= max_size
+        image = ImageOps.exif_transpose(image)
+        fingerprint = dhash(image) if fingerprint else None
+        if done:
+            return False, fingerprint
+        image.thumbnail((max_size, max_size), Image.LANCZOS)
+        if lossless:
+            if image.mode not in ('1', 'L', 'P', 'RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            image.save(tmp_path, 'PNG', **PNG_OPTIONS)
+        else:
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+            image.save(tmp_path, 'WEBP', **WEBP_OPTIONS)
+
+    if os.path.getsize(tmp_path) >= os.path.getsize(source_path):
+        os.remove(tmp_path)
+        return False, fingerprint
+    os.replace(tmp_path, target_path)
+    return True, fingerprint
+
+
+def fields_for(model):
+    return NORMALIZED_FIELDS.get(model._meta.label, {})
+
+
+def note_new_uploads(instance):
+    """Remember which image fields hold a file that this save will store"""
+    instance._new_uploads = [
+        field for field in fields_for(type(instance))
+        if getattr(instance, field) and not getattr(instance, field)._committed
+    ]
+
+
+def schedule_normalization(instance):
+    """Queue the uploads noted by note_new_uploads() once the save commits"""
+    new_uploads = getattr(instance, '_new_uploads', None)
+    if not new_uploads:
+        return
+    instance._new_uploads = []
+    model = type(instance)
+    for field in new_uploads:
+        name = getattr(instance, field).name
+        transaction.on_commit(lambda field=field, name=name: submit(model, instance.pk, field, name))
+
+
+def submit(model, pk, field, name):
+    max_size, lossless = fields_for(model)[field]
+    storage = model._meta.get_field(field).storage
+    try:
+        source_path = storage.path(name)
+    except NotImplementedError:
+        return None  # remote storage: nothing to normalize in place
+
+    fd, target_path = tempfile.mkstemp(suffix='.png' if lossless else '.webp')
+    os.close(fd)
+    fingerprint = (model._meta.label, field) in FINGERPRINTED_FIELDS
+    future = get_executor().submit(
+        normalize_image, source_path, target_path, max_size, lossless, fingerprint
+    )
+    future.add_done_callback(lambda f: _finish(f, model, pk, field, name, target_path))
+    return future
+
+
+def _finish(future, model, pk, field, name, target_path):
+    """Store the normalized file, point the row at it and drop the original"""
+    try:
+        written, fingerprint = future.result()
+        if fingerprint is not None:
+            from .screenshot_hashes import store_hash
+            store_hash(pk, fingerprint)
+        if not written:
+            return
+        storage = model._meta.get_field(field).storage
+        with open(target_path, 'rb') as f:
+            new_name = storage.save(os.path.splitext(name)[0] + os.path.splitext(target_path)[1], File(f))
+        with transaction.atomic():
+            # Only if the row still holds the file we normalized
+            instance = model._default_manager.select_for_update().filter(pk=pk, **{field: name}).first()
+            if instance is not None:
+                setattr(instance, field, new_name)
+                instance.save(update_fields=[field])
+        storage.delete(name if instance is not None else new_name)
+    except Exception:
+        logger.exception('Normalizing %s of %s #%s failed', field, model._meta.label, pk)
+    finally:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        # Runs on the pool's result thread, which has its own connection
+        connection.close()
+
+
+def normalize_existing(model_label, field, batch_size=100):
+    """Queue every stored file of ``model_label.field``; returns the futures"""
+    model = apps.get_model(model_label)
+    rows = model._default_manager.exclude(**{field: ''}).values_list('pk', field)
+    futures = []
+    for pk, name in rows.iterator(chunk_size=batch_size):
+        future = submit(model, pk, field, name)
+        if future is not None:
+            futures.append(future)
+    return futures
@@ -0,0 +1,59 @@
+"""
+Staff user lookup
+Finds players by any identifier they quote to support (username, e-mail,
+user ID, phone or referral code) and annotates the numbers staff check
+first, all in the query that loads the page. Search results are keyset
+paginated newest first, like the unfiltered list.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from . import search
+from .models import PaymentRequest, User
+
+
+LOOKUP_PAGE_SIZE = 50
+
+
+def with_lookup_stats(queryset):
+    """Annotate ``pending_payments`` from a correlated (user_id, status) index probe"""
+    pending = (
+        PaymentRequest.objects.filter(user=OuterRef('pk'), status='pending')
+        .order_by()
+        .values('user')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return queryset.annotate(
+        pending_payments=Coalesce(Subquery(pending, output_field=IntegerField()), 0)
+    )
+
+
+def exact_match_q(term):
+    """Equality on every identifier column, each backed by a B-tree index"""
+    digits = ''.join(ch for ch in term if ch.isdigit())
+    q = (
+        Q(username=term)
+        | Q(user_id__in={term, term.upper()})
+        | Q(referral_code__in={term, term.upper()})
+        | Q(email__in={term, term.lower()})
+    )
+    if digits:
+        q |= Q(phone__in={term, digits})
+    return q
+
+
+def lookup_users(term):
+    """
+    Users matching ``term``: exact identifier matches and trigram
+    (substring) matches, as one filter that pages like the full user list.
+    Terms shorter than a trigram fall back to a case-insensitive username
+    prefix; that short a prefix matches a large share of the table anyway.
+    """
+    term = term.strip()
+    if not term:
+        return User.objects.none()
+
+    hits = search.matching('user', term)
+    fuzzy = Q(username__istartswith=term) if hits is None else Q(pk__in=hits)
+    return User.objects.filter(exact_match_q(term) | fuzzy)
@@ -0,0 +1,19 @@
+"""
+Django settings for gaming_platform project.
+
+DJANGO_PROFILE picks the profile: 'dev' (default) or 'prod'. Both start
+from base.py. Check a deployment with ``manage.py settings_checklist``.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+PROFILE = os.environ.get('DJANGO_PROFILE', 'dev')
+
+if PROFILE == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif PROFILE == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f"DJANGO_PROFILE must be 'dev' or 'prod', not {PROFILE!r}")
@@ -0,0 +1,13 @@
+"""
+Development profile: debug pages, templates re-read on every request.
+"""
+from .base import *  # noqa: F401,F403
+
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-your-secret-key-change-in-production'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = ['*']
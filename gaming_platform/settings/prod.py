@@ -0,0 +1,90 @@
+"""
+Production profile
+Everything here is read from the environment:
+
+    DJANGO_SECRET_KEY      required
+    DJANGO_ALLOWED_HOSTS   comma-separated host names, required
+    DJANGO_SECURE_PROXY    '1' when a TLS-terminating proxy sets
+                           X-Forwarded-Proto (default '1')
+    DB_CONN_MAX_AGE        seconds to keep database connections (600)
+    DB_WRITE_QUEUE         '1' to serialize each process's SQLite write
+                           transactions (default '1')
+    DJANGO_LOG_LEVEL       level of the project loggers (WARNING)
+
+Run ``manage.py build_icons``/``build_assets`` before ``collectstatic``.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, MIDDLEWARE, STORAGES, TEMPLATES
+
+
+def require_env(name):
+    value = os.environ.get(name)
+    if not value:
+        raise ImproperlyConfigured(f'{name} must be set for the prod profile')
+    return value
+
+
+DEBUG = False
+
+SECRET_KEY = require_env('DJANGO_SECRET_KEY')
+
+ALLOWED_HOSTS = [host.strip() for host in require_env('DJANGO_ALLOWED_HOSTS').split(',') if host.strip()]
+
+# Persistent connections, checked before reuse
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 600))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+if DATABASES['default']['ENGINE'] == 'core.sqlite':
+    DATABASES['default']['OPTIONS']['write_queue'] = os.environ.get('DB_WRITE_QUEUE', '1') == '1'
+
+# Compiled templates kept in memory (the cached loader needs APP_DIRS off)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Compress responses; right after SecurityMiddleware so it sees the final body
+MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+                  'core.middleware.CompressionMiddleware')
+
+# Hashed static names (the core.assets bundles are hashed already; this
+# covers everything else) so STATIC_URL can be cached for a year
+STORAGES['staticfiles'] = {
+    'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+}
+
+SESSION_COOKIE_SECURE = True
+SESSION_COOKIE_HTTPONLY = True
+SESSION_COOKIE_SAMESITE = 'Lax'
+CSRF_COOKIE_SECURE = True
+
+if os.environ.get('DJANGO_SECURE_PROXY', '1') == '1':
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SECURE_SSL_REDIRECT = True
+SECURE_HSTS_SECONDS = 60 * 60 * 24 * 30
+SECURE_CONTENT_TYPE_NOSNIFF = True
+
+# Warnings and errors only, to stderr for the process manager to collect;
+# nothing is logged per request or per query
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'concise': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'concise'},
+    },
+    'root': {'handlers': ['console'], 'level': 'WARNING'},
+    'loggers': {
+        'django.request': {'level': 'ERROR'},
+        'django.db.backends': {'level': 'WARNING', 'propagate': True},
+        'core': {'level': os.environ.get('DJANGO_LOG_LEVEL', 'WARNING')},
+    },
+}
@@ -1,13 +1,31 @@
 """
 URL configuration for gaming_platform project.
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core import pwa
+from core.catalog import store_game_items_page, store_page
+from core.home import home_page
+from core.leaderboard import leaderboard_page
+from core.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),  # Django admin
     path('dashboard/', include('core.custom_admin_urls')),  # Custom admin panel
+    # Access-checked; the transfer is offloaded per MEDIA_SERVE_BACKEND
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+    # Served from the root so the worker's scope is the whole site
+    path('sw.js', pwa.service_worker, name='service_worker'),
+    path('manifest.webmanifest', pwa.manifest, name='web_manifest'),
+    path('offline/', pwa.offline, name='offline'),
+    # Ahead of core.urls: the page-cached public views
+    path('', home_page, name='home'),  # core/home.py
+    path('store/', store_page, name='store'),  # core/catalog.py
+    path('store/<slug:slug>/', store_game_items_page, name='store_game_items'),  # core/catalog.py
+    path('leaderboard/', leaderboard_page, name='leaderboard'),  # core/leaderboard.py
     path('', include('core.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
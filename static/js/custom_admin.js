@@ -0,0 +1,49 @@
+// Mobile menu toggle
+const menuToggle = document.getElementById('adminMenuToggle');
+const sidebar = document.getElementById('adminSidebar');
+const backdrop = document.getElementById('adminBackdrop');
+
+function toggleSidebar() {
+    sidebar?.classList.toggle('active');
+    backdrop?.classList.toggle('active');
+    document.body.style.overflow = sidebar?.classList.contains('active') ? 'hidden' : '';
+}
+
+menuToggle?.addEventListener('click', toggleSidebar);
+backdrop?.addEventListener('click', toggleSidebar);
+
+// Close sidebar when clicking nav links on mobile
+if (window.innerWidth <= 1024) {
+    document.querySelectorAll('.admin-nav-link').forEach(link => {
+        link.addEventListener('click', () => {
+            sidebar?.classList.remove('active');
+            backdrop?.classList.remove('active');
+            document.body.style.overflow = '';
+        });
+    });
+}
+
+// Close messages
+document.querySelectorAll('.admin-message-close').forEach(btn => {
+    btn.addEventListener('click', function() {
+        this.closest('.admin-message').style.animation = 'slideOut 0.3s ease';
+        setTimeout(() => this.closest('.admin-message').remove(), 300);
+    });
+});
+
+// Auto-close messages after 5 seconds
+setTimeout(() => {
+    document.querySelectorAll('.admin-message').forEach(msg => {
+        msg.style.animation = 'slideOut 0.3s ease';
+        setTimeout(() => msg.remove(), 300);
+    });
+}, 5000);
+
+// Prevent body scroll when sidebar is open on mobile
+window.addEventListener('resize', () => {
+    if (window.innerWidth > 1024) {
+        sidebar?.classList.remove('active');
+        backdrop?.classList.remove('active');
+        document.body.style.overflow = '';
+    }
+});
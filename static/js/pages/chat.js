@@ -0,0 +1,27 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const messagesArea = document.getElementById('messagesArea');
+    const messageInput = document.getElementById('id_message');
+    const subjectInput = document.getElementById('id_subject');
+
+    // Auto-resize textarea
+    messageInput.addEventListener('input', function() {
+        this.style.height = 'auto';
+        this.style.height = (this.scrollHeight) + 'px';
+    });
+
+    // Scroll to bottom on load
+    messagesArea.scrollTop = messagesArea.scrollHeight;
+});
+
+function toggleSubject() {
+    const subjectWrapper = document.getElementById('subjectWrapper');
+    const subjectInput = document.getElementById('id_subject');
+
+    if (subjectWrapper.style.display === 'none') {
+        subjectWrapper.style.display = 'flex';
+        subjectInput.focus();
+    } else {
+        subjectWrapper.style.display = 'none';
+        subjectInput.value = '';
+    }
+}
@@ -0,0 +1,67 @@
+let currentSlideIndex = 0;
+let slideInterval;
+
+// Initialize slider once the page has loaded, so preloading the next
+// slide never competes with first paint
+window.addEventListener('load', function() {
+    showSlide(currentSlideIndex);
+    startAutoSlide();
+});
+
+function showSlide(index) {
+    const slides = document.querySelectorAll('.slide');
+    const dots = document.querySelectorAll('.dot');
+
+    if (index >= slides.length) {
+        currentSlideIndex = 0;
+    }
+    if (index < 0) {
+        currentSlideIndex = slides.length - 1;
+    }
+
+    // Hide all slides
+    slides.forEach(slide => slide.classList.remove('active'));
+    dots.forEach(dot => dot.classList.remove('active'));
+
+    // Show current slide; fetch its image and the next one's ahead of time
+    loadSlideImage(slides[currentSlideIndex]);
+    loadSlideImage(slides[(currentSlideIndex + 1) % slides.length]);
+    slides[currentSlideIndex].classList.add('active');
+    dots[currentSlideIndex].classList.add('active');
+}
+
+function loadSlideImage(slide) {
+    if (!slide) return;
+    slide.querySelectorAll('[data-srcset]').forEach(el => {
+        el.srcset = el.dataset.srcset;
+        el.removeAttribute('data-srcset');
+    });
+    slide.querySelectorAll('img[data-src]').forEach(img => {
+        img.src = img.dataset.src;
+        img.removeAttribute('data-src');
+    });
+}
+
+function changeSlide(direction) {
+    currentSlideIndex += direction;
+    showSlide(currentSlideIndex);
+    resetAutoSlide();
+}
+
+function currentSlide(index) {
+    currentSlideIndex = index;
+    showSlide(currentSlideIndex);
+    resetAutoSlide();
+}
+
+function startAutoSlide() {
+    slideInterval = setInterval(() => {
+        currentSlideIndex++;
+        showSlide(currentSlideIndex);
+    }, 5000); // Change slide every 5 seconds
+}
+
+function resetAutoSlide() {
+    clearInterval(slideInterval);
+    startAutoSlide();
+}
@@ -7,6 +7,11 @@
     const SHOW_ON_MOBILE_ONLY = true; // Set to false to show on all devices
     const SHOW_ONLY_ON_HOME = true; // Only show on home page
     
+    // Launched from the home screen: the OS already showed the manifest's splash
+    function isInstalledApp() {
+        return window.matchMedia('(display-mode: standalone)').matches || navigator.standalone === true;
+    }
+    
     // Check if splash should be shown
     function shouldShowSplash() {
         // Check if it's a mobile device
@@ -28,6 +33,10 @@
             }
         }
         
+        if (isInstalledApp()) {
+            return false;
+        }
+        
         if (SHOW_ON_MOBILE_ONLY && !isMobile) {
             return false;
         }
@@ -51,6 +60,7 @@
         const splash = document.getElementById('splashScreen');
         
         if (!splash) {
+            registerWhenLoaded();
             return;
         }
         
@@ -59,6 +69,7 @@
             // Immediately hide splash if it shouldn't be shown
             splash.style.display = 'none';
             splash.remove(); // Remove from DOM to prevent any issues
+            registerWhenLoaded();
             return;
         }
         
@@ -109,9 +120,33 @@
         setTimeout(function() {
             splash.style.display = 'none';
             splash.remove(); // Completely remove from DOM
+            registerWhenLoaded();
         }, 500);
     }
     
+    // Register the service worker (core.pwa) once the page and splash are
+    // done, so precaching doesn't compete with the first render
+    let serviceWorkerRegistered = false;
+    
+    function registerServiceWorker() {
+        const url = document.body.dataset.serviceWorker;
+        if (serviceWorkerRegistered || !url || !('serviceWorker' in navigator)) {
+            return;
+        }
+        serviceWorkerRegistered = true;
+        navigator.serviceWorker.register(url, { scope: '/' }).catch(function(error) {
+            console.warn('Service worker registration failed:', error);
+        });
+    }
+    
+    function registerWhenLoaded() {
+        if (document.readyState === 'complete') {
+            registerServiceWorker();
+        } else {
+            window.addEventListener('load', registerServiceWorker, { once: true });
+        }
+    }
+    
     // Check if page is loaded
     if (document.readyState === 'loading') {
         document.addEventListener('DOMContentLoaded', initSplash);
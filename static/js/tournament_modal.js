@@ -0,0 +1,75 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const createBtn = document.getElementById('createTournamentBtn');
+    const modal = document.getElementById('createTournamentModal');
+    const closeBtn = document.getElementById('closeTournamentModal');
+    const overlay = modal?.querySelector('.modal-overlay');
+    const confirmBtn = document.getElementById('confirmGameSelection');
+    const gameCards = document.querySelectorAll('.game-card');
+    let selectedGame = null;
+
+    function openModal(e) {
+        if (e) {
+            e.preventDefault();
+            e.stopPropagation();
+        }
+
+        if (modal) {
+            modal.classList.add('active');
+            modal.style.display = 'flex';
+            document.body.style.overflow = 'hidden';
+        }
+    }
+
+    function closeModal() {
+        if (modal) {
+            modal.classList.remove('active');
+            document.body.style.overflow = '';
+            selectedGame = null;
+            gameCards.forEach(card => card.classList.remove('selected'));
+            if (confirmBtn) confirmBtn.disabled = true;
+
+            setTimeout(() => {
+                modal.style.display = '';
+            }, 300);
+        }
+    }
+
+    // Mobile button only
+    if (createBtn) {
+        createBtn.addEventListener('click', openModal);
+    }
+
+    if (closeBtn) {
+        closeBtn.addEventListener('click', closeModal);
+    }
+
+    if (overlay) {
+        overlay.addEventListener('click', closeModal);
+    }
+
+    // Game selection
+    gameCards.forEach(card => {
+        card.addEventListener('click', function() {
+            gameCards.forEach(c => c.classList.remove('selected'));
+            this.classList.add('selected');
+            selectedGame = this.dataset.game;
+            if (confirmBtn) confirmBtn.disabled = false;
+        });
+    });
+
+    // Confirm and redirect
+    if (confirmBtn) {
+        confirmBtn.addEventListener('click', function() {
+            if (selectedGame) {
+                window.location.href = '/tournaments/create/' + selectedGame + '/';
+            }
+        });
+    }
+
+    // ESC key to close modal
+    document.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape' && modal && modal.classList.contains('active')) {
+            closeModal();
+        }
+    });
+});
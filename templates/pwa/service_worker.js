@@ -0,0 +1,107 @@
+// Service Worker (generated by core.pwa)
+'use strict';
+
+const CONFIG = {{ config|safe }};
+
+const SHELL_CACHE = 'shell-' + CONFIG.version;
+const PAGE_CACHE = 'pages-' + CONFIG.version;
+
+// Install: precache the shell
+self.addEventListener('install', function(event) {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(function(cache) { return cache.addAll(CONFIG.precache); })
+            .then(function() { return self.skipWaiting(); })
+    );
+});
+
+// Activate: drop caches from earlier builds
+self.addEventListener('activate', function(event) {
+    event.waitUntil(
+        caches.keys()
+            .then(function(keys) {
+                return Promise.all(keys
+                    .filter(function(key) { return key !== SHELL_CACHE && key !== PAGE_CACHE; })
+                    .map(function(key) { return caches.delete(key); }));
+            })
+            .then(function() { return self.clients.claim(); })
+    );
+});
+
+function startsWithAny(path, prefixes) {
+    return prefixes.some(function(prefix) { return path.startsWith(prefix); });
+}
+
+function cacheable(response) {
+    return response && response.status === 200 && response.type === 'basic' && !response.redirected;
+}
+
+// Fingerprinted assets never change: cache first, network on a miss
+function cacheFirst(request) {
+    return caches.match(request).then(function(cached) {
+        return cached || fetch(request).then(function(response) {
+            if (cacheable(response)) {
+                const copy = response.clone();
+                caches.open(SHELL_CACHE).then(function(cache) { cache.put(request, copy); });
+            }
+            return response;
+        });
+    });
+}
+
+// Answer from cache right away and refresh it in the background
+function staleWhileRevalidate(event, cacheName) {
+    const request = event.request;
+    const network = fetch(request).then(function(response) {
+        if (cacheable(response)) {
+            const copy = response.clone();
+            event.waitUntil(caches.open(cacheName).then(function(cache) { return cache.put(request, copy); }));
+        }
+        return response;
+    });
+    return caches.open(cacheName)
+        .then(function(cache) { return cache.match(request); })
+        .then(function(cached) {
+            if (cached) {
+                event.waitUntil(network.catch(function() {}));
+                return cached;
+            }
+            return network.catch(function() { return caches.match(CONFIG.offline); });
+        });
+}
+
+// Other pages: always from the network, the offline page without one
+function networkWithFallback(request) {
+    return fetch(request).catch(function() {
+        return caches.match(request, { ignoreSearch: true }).then(function(cached) {
+            return cached || caches.match(CONFIG.offline);
+        });
+    });
+}
+
+self.addEventListener('fetch', function(event) {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+
+    // State changes (and signing in or out) make cached pages stale or
+    // show another user's details
+    if (request.method !== 'GET' || CONFIG.resetPages.includes(url.pathname)) {
+        event.waitUntil(caches.delete(PAGE_CACHE));
+        return;
+    }
+
+    if (startsWithAny(url.pathname, CONFIG.cacheFirst)) {
+        event.respondWith(cacheFirst(request));
+    } else if (url.pathname.startsWith(CONFIG.static)) {
+        event.respondWith(staleWhileRevalidate(event, SHELL_CACHE));
+    } else if (request.mode === 'navigate' && CONFIG.swrPages.includes(url.pathname) && !url.search) {
+        event.respondWith(staleWhileRevalidate(event, PAGE_CACHE));
+    } else if (request.mode === 'navigate') {
+        event.respondWith(networkWithFallback(request));
+    }
+    // Everything else (media, admin, API calls) goes straight to the network
+});